@@ -1,24 +1,21 @@
 import json
 from typing import TypedDict, Dict
-import requests
-from bs4 import BeautifulSoup
-
 from langgraph.graph import StateGraph, END
 from langchain.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
 
+from http_client import http_get
+from html_extract import extract_main_content
+from llm_scheduler import ScheduledChatModel, get_llm_scheduler
+
 # Helper function to fetch full article text given a URL.
 def get_article_text(url: str) -> str:
     headers = {'User-Agent': 'Mozilla/5.0 (compatible; MyRSSReader/1.0)'}
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_get(url, headers=headers, timeout=10)
         response.raise_for_status()
-        html = response.text
-        soup = BeautifulSoup(html, "html.parser")
-        paragraphs = soup.find_all("p")
-        text = "\n".join([p.get_text() for p in paragraphs])
-        return text
+        return extract_main_content(response.text)
     except Exception as e:
         print(f"Error fetching article content from {url}: {e}")
         return ""
@@ -32,7 +29,7 @@ class ArticleState(TypedDict):
     source: str               # RSS source name
 
 # Initialize your LLM (using your preferred model and temperature)
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=)
+llm = ScheduledChatModel(ChatOpenAI(model="gpt-4o-mini", temperature=0, max_retries=0), get_llm_scheduler())
 
 # Define the ranking node.
 def ranking_node(state: ArticleState) -> dict:
@@ -4,6 +4,7 @@ import pandas as pd
 from datetime import datetime
 import json
 import traceback
+from http_client import http_get
 
 def analyze_single_feed(url, source_name):
     """Analyze a single RSS feed and return structure information."""
@@ -17,7 +18,7 @@ def analyze_single_feed(url, source_name):
     try:
         # Fetch the feed
         print("Fetching feed...")
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_get(url, headers=headers, timeout=15)
         response.raise_for_status()
         
         # Parse with feedparser
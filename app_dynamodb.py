@@ -9,7 +9,7 @@ import boto3
 from boto3.dynamodb.conditions import Key, Attr
 from dotenv import load_dotenv
 from openai import OpenAI
-from prompts import prompt_dict
+from prompts import prompt_dict, RANKING_PROMPT, BATCH_RANKING_PROMPT, RANKING_TOPICS
 import json
 from typing import TypedDict, Dict
 from langgraph.graph import StateGraph, END
@@ -18,7 +18,26 @@ from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage
 from datetime import datetime, timedelta
 import traceback
-from date_utils import parse_rss_date
+from date_utils import parse_rss_date, ISO_OUTPUT_FORMAT
+from http_client import http_get
+from article_lookup import find_existing_urls
+from known_urls import KnownUrlIndex
+from article_fetcher import download_article, fetch_articles
+from concurrent_ranking import RANKING_MAX_CONCURRENCY, rank_concurrently
+from batched_ranking import RANKING_BATCH_ARTICLE_TOKENS, RANKING_BATCH_SIZE, rank_in_batches, strip_code_fences
+from token_utils import estimate_tokens, split_into_chunks, token_reduction, token_savings, truncate_head_tail
+from ranking_cache import RankingCache, content_hash, ranking_version
+from prerank import SCORE_FIELDS, PreRanker, train_from_articles
+from near_duplicates import NEAR_DUPLICATE_THRESHOLD, cluster_near_duplicates
+from model_router import (RANKING_MODEL_TIERS, RANKING_ROUTING, choose_tier, latency_report, next_tier,
+                          ranking_problem, routing_fingerprint)
+from llm_scheduler import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, ScheduledChatModel, estimate_message_tokens, get_llm_scheduler
+from content_cache import ContentCache
+from feed_collector import collect_feeds
+from feed_cache import FeedValidatorStore, FeedSnapshotCache
+from feed_scheduler import FeedScheduler
+import threading
+import time
 
 # Add AWS Credentials Verification
 def verify_aws_credentials():
@@ -71,80 +90,113 @@ def get_dynamodb_table():
 # Initialize DynamoDB table
 table = get_dynamodb_table()
 
+# Parallel BatchGetItem requests when checking which feed entries are new
+DYNAMODB_LOOKUP_WORKERS = int(os.getenv("DYNAMODB_LOOKUP_WORKERS", "4"))
+
+# Local index of URLs already in DynamoDB - checked before any remote lookup
+KNOWN_URL_DB = os.getenv("KNOWN_URL_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "known_urls.sqlite3"))
+KNOWN_URL_RESYNC_SECONDS = int(os.getenv("KNOWN_URL_RESYNC_SECONDS", str(24 * 60 * 60)))
+known_url_index = KnownUrlIndex(KNOWN_URL_DB)
+
+def ensure_known_url_index():
+    """Fill the local URL index from a keys-only scan on first use, and re-sync it once a day."""
+    if known_url_index.needs_full_sync(KNOWN_URL_RESYNC_SECONDS):
+        synced = known_url_index.sync_from_table(table)
+        print(f"🗂️ Known-URL index synced from DynamoDB: {synced} URLs")
+
+def find_new_articles(df, days_back=7):
+    """
+    Select the feed rows worth processing: recent first, then not yet stored.
+    
+    The days-back cutoff is one vectorized mask on the native date column, so
+    only recent URLs go through the local index and the DynamoDB lookup.
+    
+    Args:
+        df: Feed DataFrame from get_all_feeds
+        days_back: Number of days to look back
+    
+    Returns:
+        tuple: (recent_df, new_df, lookup_stats)
+    """
+    recent_df = filter_feed_by_date(df, days_back=days_back)
+    if recent_df.empty:
+        return recent_df, recent_df, {"known_locally": 0, "checked_remotely": 0}
+    
+    recent_urls = recent_df["URL"].tolist()
+    ensure_known_url_index()
+    candidate_urls = known_url_index.filter_unknown(recent_urls)
+    existing_urls = find_existing_urls(table, candidate_urls, max_workers=DYNAMODB_LOOKUP_WORKERS)
+    known_url_index.add_many(existing_urls)
+    
+    new_urls = set(candidate_urls) - existing_urls
+    new_df = recent_df[recent_df["URL"].isin(new_urls)]
+    lookup_stats = {
+        "known_locally": len(recent_urls) - len(candidate_urls),
+        "checked_remotely": len(candidate_urls),
+    }
+    return recent_df, new_df, lookup_stats
+
 # ---------------------------
 # Helper Functions & Globals
 # ---------------------------
-def filter_articles_by_date(articles_list, days_back=7):
+def to_utc_datetime(values):
+    """
+    Convert a column of standardized date strings to datetime64[ns, UTC] in one batch.
+    
+    Values are already normalized by parse_rss_date, so the explicit format
+    avoids per-element format inference; anything else becomes NaT.
+    """
+    return pd.to_datetime(values, utc=True, format=ISO_OUTPUT_FORMAT, errors='coerce')
+
+def format_utc_timestamp(value):
+    """Format a datetime value (or an already standardized string) as the ISO string stored in DynamoDB."""
+    if isinstance(value, str):
+        return value
+    if value is None or pd.isna(value):
+        return datetime.utcnow().strftime(ISO_OUTPUT_FORMAT)
+    return pd.Timestamp(value).strftime(ISO_OUTPUT_FORMAT)
+
+def filter_feed_by_date(df, days_back=7):
     """
-    Filter articles to only include those from the last N days.
-    Fixed timezone handling to avoid comparison errors.
+    Keep only feed rows from the last N days with one vectorized comparison.
     
     Args:
-        articles_list: List of article dictionaries
+        df: Feed DataFrame with a datetime64[ns, UTC] 'Date Created' column
+            (string columns are converted in one batch)
         days_back: Number of days to look back (default: 7)
     
     Returns:
-        Filtered list of recent articles
+        DataFrame of recent rows (same index and columns)
     """
-    from datetime import datetime, timedelta
-    import pandas as pd
-    
-    if not articles_list:
-        return []
+    if df.empty:
+        return df
     
-    # Calculate cutoff date (UTC, timezone-naive)
-    cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-    
-    filtered_articles = []
-    total_articles = len(articles_list)
-    skipped_articles = 0
+    dates = df['Date Created']
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = to_utc_datetime(dates)
     
+    cutoff_date = pd.Timestamp.utcnow() - pd.Timedelta(days=days_back)
     print(f"🗓️ Filtering articles newer than: {cutoff_date.strftime('%Y-%m-%d %H:%M:%S')} UTC")
     
-    for article in articles_list:
-        try:
-            # Parse the article date
-            article_date_str = article.get('Date Created', '')
-            if not article_date_str or article_date_str == 'No Date':
-                skipped_articles += 1
-                continue
-            
-            # Parse with pandas (handles various formats)
-            article_date = pd.to_datetime(article_date_str, utc=True)
-            
-            # Convert to naive datetime in UTC for comparison
-            if article_date.tzinfo is not None:
-                article_date_naive = article_date.tz_convert('UTC').tz_localize(None)
-            else:
-                article_date_naive = article_date
-            
-            # Compare with cutoff (both now timezone-naive UTC)
-            if article_date_naive >= cutoff_date:
-                filtered_articles.append(article)
-                
-        except Exception as e:
-            # If date parsing fails, skip the article
-            print(f"⚠️ Date parsing error for article '{article.get('Title', 'Unknown')[:50]}...': {e}")
-            skipped_articles += 1
-            continue
+    recent_df = df[dates >= cutoff_date]
     
-    filtered_count = len(filtered_articles)
+    total_articles = len(df)
+    filtered_count = len(recent_df)
+    skipped_articles = int(dates.isna().sum())
     
     print(f"📅 Date Filter Results:")
     print(f"   📄 Total articles: {total_articles}")
     print(f"   📅 Articles from last {days_back} days: {filtered_count}")
     print(f"   ⚠️ Skipped articles (date issues): {skipped_articles}")
-    if total_articles > 0:
-        print(f"   💰 Cost reduction: {((total_articles - filtered_count) / total_articles * 100):.1f}%")
+    print(f"   💰 Cost reduction: {((total_articles - filtered_count) / total_articles * 100):.1f}%")
     
     # Show sample of recent articles found
-    if filtered_articles:
+    if filtered_count:
         print(f"✅ Sample recent articles:")
-        for i, article in enumerate(filtered_articles[:3]):
-            print(f"   {i+1}. {article.get('Date Created', 'No Date')} - {article.get('Title', 'No Title')[:60]}...")
+        for i, (_, article) in enumerate(recent_df.head(3).iterrows()):
+            print(f"   {i+1}. {article.get('Date Created', 'No Date')} - {str(article.get('Title', 'No Title'))[:60]}...")
     
-    return filtered_articles
-
+    return recent_df
 
 def get_all_articles():
     """Get all articles from DynamoDB with pagination support."""
@@ -216,80 +268,251 @@ def display_recent_update():
         st.error(f"Error fetching recent update: {e}")
         st.error(f"Details: {traceback.format_exc()}")
 
-def get_article_text(url):
-    """Fetches the full article text from the URL by parsing HTML paragraphs."""
-    headers = {'User-Agent': 'Mozilla/5.0 (compatible; MyRSSReader/1.0)'}
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        html = response.text
-        soup = BeautifulSoup(html, "html.parser")
-        paragraphs = soup.find_all("p")
-        return "\n".join([p.get_text() for p in paragraphs])
-    except Exception as e:
-        st.error(f"Error fetching article content from {url}: {e}")
-        return ""
+# Local pre-ranker - skips clearly off-topic articles before any download or LLM call
+PRERANK_MODEL_PATH = os.getenv("PRERANK_MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "prerank.json"))
+PRERANK_THRESHOLD = float(os.getenv("PRERANK_THRESHOLD", "0.15"))
+pre_ranker = PreRanker.load(PRERANK_MODEL_PATH)
+
+def prerank_articles(rows, threshold=PRERANK_THRESHOLD):
+    """
+    Split feed rows into those worth ranking and those the pre-ranker skips.
+    Only a trained model gates; the keyword fallback just scores for display.
+    Every row gets its score stored under 'prerank_score'.
+    
+    Returns:
+        tuple: (rows to rank, [(row, score)] skipped)
+    """
+    keep, skipped = [], []
+    for row in rows:
+        score = pre_ranker.score(row.get("Title", ""), row.get("Summary", ""))
+        row["prerank_score"] = round(score, 3)
+        if pre_ranker.is_trained and score < threshold:
+            skipped.append((row, score))
+        else:
+            keep.append(row)
+    return keep, skipped
+
+def pre_ranker_section(articles):
+    """Train the pre-ranker on stored LLM scores and show its precision/recall by threshold."""
+    global pre_ranker
+    st.markdown("### Local Pre-ranker")
+    if pre_ranker.is_trained:
+        trained_at = datetime.utcfromtimestamp(pre_ranker.trained_at).strftime("%Y-%m-%d %H:%M UTC") if pre_ranker.trained_at else "unknown"
+        st.write(f"Trained on {pre_ranker.trained_on} articles ({trained_at}); skipping articles scored below {PRERANK_THRESHOLD}")
+    else:
+        st.write("Not trained yet - every new article goes to the LLM.")
+    
+    if st.button("Train Pre-ranker from Stored Scores"):
+        try:
+            model, evaluation, holdout = train_from_articles(articles)
+        except ValueError as e:
+            st.error(f"Could not train the pre-ranker: {e}")
+            return
+        model.save(PRERANK_MODEL_PATH)
+        pre_ranker = model
+        st.success(f"✅ Trained on {model.trained_on} articles; evaluated on {holdout} held-out articles")
+        st.write("Precision/recall against the LLM's own scores (relevant = any topic ≥ 6). "
+                 "Recall is the share of relevant articles that still reach the LLM; set PRERANK_THRESHOLD accordingly.")
+        st.dataframe(pd.DataFrame(evaluation))
+
+# Article text cache - filled at ingest, read by content creation (no refetch on reruns)
+ARTICLE_CACHE_DIR = os.getenv("ARTICLE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "articles"))
+article_cache = ContentCache(
+    max_entries=int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", "256")),
+    max_chars=int(os.getenv("ARTICLE_CACHE_MAX_CHARS", str(64 * 1024 * 1024))),
+    ttl=int(os.getenv("ARTICLE_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60))),
+    disk_dir=ARTICLE_CACHE_DIR or None,  # Set ARTICLE_CACHE_DIR="" to keep the cache in memory only
+    disk_max_bytes=int(os.getenv("ARTICLE_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+)
+
+# Tiers whose stored text is only the RSS title and summary - the body was never downloaded
+SUMMARY_ONLY_TIERS = ("summary", "near_duplicate")
+
+def get_cached_article_text(url, fallback_text=None, summary_only=False):
+    """
+    Return article text from the cache, falling back to the text stored with
+    the article in DynamoDB. Only goes to the network for summary_only
+    articles (ranked on the summary tier or inherited from a near-duplicate):
+    their body is downloaded on the first cache miss, and the stored summary
+    is used - but not cached - if that fails.
+    """
+    article_text = article_cache.get(url)
+    if not article_text and summary_only:
+        try:
+            article_text, _ = download_article(url)
+        except Exception as e:
+            st.warning(f"Could not fetch the full article, using its RSS summary: {e}")
+        if article_text:
+            article_cache.put(url, article_text)
+    if not article_text and fallback_text and isinstance(fallback_text, str):
+        article_text = fallback_text
+        if not summary_only:
+            article_cache.put(url, article_text)
+    return article_text or ""
 
 # Define the state for each article.
 class ArticleState(TypedDict):
-    text: str                 # Full article content (fetched from the URL)
+    text: str                 # Text that was ranked: the article body, or RSS title + summary for SUMMARY_ONLY_TIERS
     ranking: Dict[str, int]   # To be populated by the ranking node
     timestamp: str            # RSS feed timestamp
     summary: str              # RSS feed summary
     source: str               # RSS source name
+    ranking_error: str        # Set by the ranking node when the LLM output is unusable
+    ranking_report: Dict      # Tokens sent vs. article size and how the text was fitted
+    ranking_tier: str         # "summary" (RSS title + summary), "full_text" or "near_duplicate"
+    duplicate_of: str         # URL whose scores a near-duplicate inherited
+    ranking_route: str        # Model(s) that produced the scores, e.g. "gpt-4.1-nano>gpt-4o-mini" after an escalation
+    prerank_score: float      # Trained pre-ranker probability (None until trained), used for routing (not stored)
 
-# Initialize the LLM for the LangGraph agent.
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+# Every LLM call goes through one process-wide scheduler that enforces the per-model
+# request/token limits, serves content generation ahead of ranking and retries 429s,
+# timeouts, connection errors and 5xx (the clients themselves must not retry, hence max_retries=0)
+llm_scheduler = get_llm_scheduler()
 
-# Define the ranking node.
-def ranking_node(state: ArticleState):
-    prompt = PromptTemplate(
-        input_variables=["text"],
-        template="""
-        Analyze the following article content and provide a relevance score (0-15) for each of the following topics:
-        - Digital Transformation
-        - Generative AI
-        - Machine Learning / Data Science
-        - Finance in tech
-
-        Guidelines:
-        0-5: low relevance
-        6-10: medium relevance
-        11-15: high relevance
-
-        Return only a JSON object exactly in this format:
-        {{
-        "Digital Transformation": score,
-        "Generative AI": score,
-        "Machine Learning / Data Science": score,
-        "Finance in tech": score
-        }}
-
-        Do not include any additional text or explanation.
-
-        Article content:
-        {text}
-        """
+# Initialize the LLMs for the LangGraph agent: one per routing tier (model_router.py).
+# Without RANKING_ROUTING every article goes to the standard tier
+ranking_models = {
+    tier: ScheduledChatModel(ChatOpenAI(model=model, temperature=0, max_retries=0), llm_scheduler,
+                             priority=PRIORITY_BACKGROUND)
+    for tier, model in RANKING_MODEL_TIERS
+}
+llm = ranking_models["standard"]
+
+CONTENT_MODEL = "o4-mini"
+
+def create_chat_completion(messages, max_completion_tokens=10000):
+    """Content generation request, scheduled at interactive priority."""
+    client = OpenAI(max_retries=0)
+    return llm_scheduler.run(
+        CONTENT_MODEL,
+        lambda: client.chat.completions.create(
+            model=CONTENT_MODEL,
+            messages=messages,
+            max_completion_tokens=max_completion_tokens
+        ),
+        tokens=estimate_message_tokens(messages) + max_completion_tokens,
+        priority=PRIORITY_INTERACTIVE
     )
-    message = HumanMessage(content=prompt.format(text=state["text"]))
-    ranking_result = llm.invoke([message]).content.strip()
+
+# Article tokens per ranking prompt. Longer texts are either cut to their head and
+# tail ("truncate") or scored chunk by chunk and combined ("map_reduce")
+RANKING_MAX_TOKENS = int(os.getenv("RANKING_MAX_TOKENS", "3000"))
+RANKING_LONG_TEXT_MODE = os.getenv("RANKING_LONG_TEXT_MODE", "truncate")
+RANKING_MAX_CHUNKS = int(os.getenv("RANKING_MAX_CHUNKS", "4"))
+
+# Scores already computed for identical text under the current model, rubric and budget
+RANKING_CACHE_DB = os.getenv("RANKING_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "rankings.sqlite3"))
+RANKING_VERSION = ranking_version(llm.model_name, RANKING_PROMPT, BATCH_RANKING_PROMPT,
+                                  f"budget={RANKING_MAX_TOKENS};mode={RANKING_LONG_TEXT_MODE};chunks={RANKING_MAX_CHUNKS}",
+                                  *([routing_fingerprint()] if RANKING_ROUTING else []))
+ranking_cache = RankingCache(RANKING_CACHE_DB)
+
+ranking_prompt = PromptTemplate(input_variables=["text"], template=RANKING_PROMPT)
+
+def parse_ranking_output(ranking_result):
+    """Parse the ranking JSON from an LLM reply. Returns (ranking dict, error message or None)."""
+    ranking_result = strip_code_fences(ranking_result or "")
+    if not ranking_result:
+        return {}, "LLM returned an empty response for ranking."
+    try:
+        return json.loads(ranking_result), None
+    except Exception as e:
+        return {}, f"Error parsing ranking JSON: {e}. Raw output: {ranking_result}"
+
+def select_chunks(chunks, max_chunks):
+    """Keep at most max_chunks, always including the first and the last."""
+    if len(chunks) <= max_chunks:
+        return chunks
+    if max_chunks <= 1:
+        return chunks[:1]
+    return chunks[:max_chunks - 1] + chunks[-1:]
+
+def rank_in_chunks(text):
+    """
+    Map-reduce ranking: score each chunk separately (in parallel) and keep the
+    highest score per topic - an article is as relevant to a topic as its
+    most relevant part.
     
-    # Strip markdown code fences if present.
-    if ranking_result.startswith("```"):
-        ranking_result = ranking_result.replace("```", "").strip()
-        if ranking_result.lower().startswith("json"):
-            ranking_result = ranking_result[len("json"):].strip()
+    Returns:
+        tuple: (ranking dict, error or None, article tokens sent, chunks scored)
+    """
+    chunks = select_chunks(split_into_chunks(text, RANKING_MAX_TOKENS), max(1, RANKING_MAX_CHUNKS))
+    messages = [[HumanMessage(content=ranking_prompt.format(text=chunk))] for chunk in chunks]
+    replies = llm.batch(messages, return_exceptions=True)
+    
+    combined = {}
+    errors = []
+    for reply in replies:
+        if isinstance(reply, Exception):
+            errors.append(str(reply))
+            continue
+        chunk_ranking, error = parse_ranking_output(reply.content)
+        if error:
+            errors.append(error)
+            continue
+        for topic in RANKING_TOPICS:
+            try:
+                combined[topic] = max(combined.get(topic, 0), int(chunk_ranking.get(topic, 0)))
+            except (TypeError, ValueError):
+                continue
     
-    if not ranking_result:
-        st.error("LLM returned an empty response for ranking.")
-        ranking_dict = {}
+    sent_tokens = sum(estimate_tokens(chunk) for chunk in chunks)
+    if not combined:
+        return {}, "; ".join(errors) or "No chunk could be ranked.", sent_tokens, len(chunks)
+    return combined, None, sent_tokens, len(chunks)
+
+def rank_with_routing(prompt_text, prerank_score=None):
+    """
+    Score one prompt on the tier chosen by the router, escalating to the next
+    stronger model only when the reply fails to parse or looks inconsistent.
+    
+    Returns:
+        tuple: (ranking dict, error or None, route e.g. "gpt-4.1-nano>gpt-4o-mini", reason for the route)
+    """
+    tokens = estimate_tokens(prompt_text)
+    tier, reason = choose_tier(tokens, prerank_score, llm_scheduler.queue_depth(llm.model_name), RANKING_MAX_TOKENS)
+    message = HumanMessage(content=ranking_prompt.format(text=prompt_text))
+    
+    route = []
+    while True:
+        model = ranking_models[tier]
+        route.append(model.model_name)
+        ranking_dict, error = parse_ranking_output(model.invoke([message]).content)
+        problem = error or ranking_problem(ranking_dict, prerank_score)
+        stronger = next_tier(tier) if RANKING_ROUTING else None
+        if not problem or stronger is None:
+            return ranking_dict, error, ">".join(route), reason
+        reason = f"escalated: {problem[:120]}"
+        tier = stronger
+
+# Define the ranking node.
+def ranking_node(state: ArticleState):
+    text = state["text"]
+    original_tokens = estimate_tokens(text)
+    started = time.monotonic()
+    
+    cached = ranking_cache.get(text, RANKING_VERSION)
+    if cached:
+        return {"ranking": cached, "ranking_report": {**token_savings(original_tokens, 0), 'mode': "cache",
+                                                      'route': "cache", 'latency_s': round(time.monotonic() - started, 3)}}
+    
+    # No st.* calls here - the node also runs in worker threads during concurrent ranking
+    if original_tokens > RANKING_MAX_TOKENS and RANKING_LONG_TEXT_MODE == "map_reduce":
+        mode = "map_reduce"
+        ranking_dict, error, sent_tokens, _ = rank_in_chunks(text)
+        route, reason = llm.model_name, "map_reduce"
     else:
-        try:
-            ranking_dict = json.loads(ranking_result)
-        except Exception as e:
-            st.error(f"Error parsing ranking JSON: {e}. Raw output: {ranking_result}")
-            ranking_dict = {}
-    return {"ranking": ranking_dict}
+        mode = "full" if original_tokens <= RANKING_MAX_TOKENS else "head_tail"
+        prompt_text = truncate_head_tail(text, RANKING_MAX_TOKENS)
+        sent_tokens = estimate_tokens(prompt_text)
+        ranking_dict, error, route, reason = rank_with_routing(prompt_text, state.get("prerank_score"))
+    
+    report = {**token_savings(original_tokens, sent_tokens), 'mode': mode, 'route': route,
+              'route_reason': reason, 'latency_s': round(time.monotonic() - started, 3)}
+    if error:
+        return {"ranking": {}, "ranking_error": error, "ranking_report": report, "ranking_route": route}
+    ranking_cache.put(text, RANKING_VERSION, ranking_dict)
+    return {"ranking": ranking_dict, "ranking_report": report, "ranking_route": route}
 
 # Build the LangGraph agent.
 workflow = StateGraph(ArticleState)
@@ -299,71 +522,395 @@ workflow.add_edge("ranking_node", END)
 agent = workflow.compile()
 
 
-def process_article(row):
-    try:
-        article_url = row["URL"]
-        
-        # Validate URL
-        if not article_url or article_url == 'No URL':
-            st.error(f"Invalid URL for article: {row.get('Title', 'Unknown')}")
-            return None
-        
-        article_text = get_article_text(article_url)
-        if not article_text:
-            st.warning(f"No content retrieved for: {row.get('Title', 'Unknown')}")
-            return None  # Skip if content retrieval fails.
-        
+def build_article_state(row, article_text, tier="full_text"):
+    """Input state for the ranking agent from a feed row and its article text."""
+    return {
+        "text": article_text,
+        "ranking": {},
         # Use the standardized date that's already been processed in fetch_feed
-        timestamp = row["Date Created"]
-        
-        state_input: ArticleState = {
-            "text": article_text,
-            "ranking": {},
-            "timestamp": timestamp,
-            "summary": row["Summary"],
-            "source": row["RSS Source"]
-        }
-        
-        # Process with LangGraph agent
-        result_state = agent.invoke(state_input)
-        
-        # Validate that we have a result
-        if not result_state:
-            st.error(f"LangGraph agent returned empty result for: {row.get('Title', 'Unknown')}")
+        "timestamp": format_utc_timestamp(row["Date Created"]),
+        "summary": row["Summary"],
+        "source": row["RSS Source"],
+        "ranking_tier": tier,
+        # Keyword-lexicon scores from an untrained pre-ranker are display only - never route on them
+        "prerank_score": row.get("prerank_score") if pre_ranker.is_trained else None
+    }
+
+
+def finalize_ranked_article(row, result_state, token_report=None):
+    """
+    Turn the agent's output state into the record we persist.
+    Runs on the Streamlit thread (reports problems in the UI).
+    
+    Args:
+        row: Feed row dict
+        result_state: State returned by the ranking agent
+        token_report (list): If given, the ranking token report for this article is appended
+    
+    Returns:
+        dict or None: The record, or None if the result is unusable
+    """
+    # Validate that we have a result
+    if not result_state:
+        st.error(f"LangGraph agent returned empty result for: {row.get('Title', 'Unknown')}")
+        return None
+    
+    # Diagnostics only - not part of the stored record
+    ranking_error = result_state.pop("ranking_error", None)
+    ranking_report = result_state.pop("ranking_report", None)
+    result_state.pop("prerank_score", None)  # A float - DynamoDB would reject it
+    if ranking_error:
+        st.error(f"{row.get('Title', 'Unknown')}: {ranking_error}")
+    if token_report is not None and ranking_report:
+        token_report.append({'Title': row.get('Title', 'Unknown'), **ranking_report})
+    
+    # Add the URL and Title for later persistence.
+    result_state["url"] = row["URL"]
+    result_state["Title"] = row["Title"]  # Ensure the Title field is stored.
+    
+    # Transform the ranking into separate properties.
+    ranking = result_state.get("ranking", {})
+    if isinstance(ranking, str):
+        try:
+            ranking = json.loads(ranking)
+        except Exception as e:
+            st.warning(f"Failed to parse ranking JSON for {row.get('Title', 'Unknown')}: {e}")
+            ranking = {}
+    
+    # Ensure ranking values are integers
+    result_state["digital_transformation"] = int(ranking.get("Digital Transformation", 0))
+    result_state["generative_ai"] = int(ranking.get("Generative AI", 0))
+    result_state["machine_learning"] = int(ranking.get("Machine Learning / Data Science", 0))
+    result_state["finance_in_tech"] = int(ranking.get("Finance in tech", 0))
+    
+    # Validate final result
+    required_fields = ["url", "Title", "timestamp", "source", "text"]
+    for field in required_fields:
+        if field not in result_state or result_state[field] is None:
+            st.error(f"Missing required field '{field}' for article: {row.get('Title', 'Unknown')}")
             return None
-        
-        # Add the URL and Title for later persistence.
-        result_state["url"] = article_url
-        result_state["Title"] = row["Title"]  # Ensure the Title field is stored.
-        
-        # Transform the ranking into separate properties.
-        ranking = result_state.get("ranking", {})
-        if isinstance(ranking, str):
+    
+    return result_state
+
+
+def process_articles_batched(pending, batch_size, max_concurrency, progress, token_report=None):
+    """
+    Rank (row, state) pairs several per LLM request.
+    
+    Returns:
+        tuple: (pairs that still need individual ranking, finished records)
+    """
+    processed = []
+    unranked = []
+    requests_made = 0
+    done = 0
+    
+    # Identical text is never scored twice
+    uncached = []
+    for row, state in pending:
+        cached = ranking_cache.get(state["text"], RANKING_VERSION)
+        if cached:
+            report = {**token_savings(estimate_tokens(state["text"]), 0), 'mode': "cache"}
+            record = finalize_ranked_article(row, {**state, "ranking": cached, "ranking_report": report}, token_report)
+            if record:
+                processed.append(record)
+            done += 1
+        else:
+            uncached.append((row, state))
+    
+    articles = [(f"a{i}", state["text"]) for i, (_, state) in enumerate(uncached)]
+    by_id = {article_id: pair for (article_id, _), pair in zip(articles, uncached)}
+    
+    for result in rank_in_batches(llm, articles, batch_size=batch_size, max_concurrency=max_concurrency):
+        requests_made += result['requests']
+        if result['error']:
+            st.warning(f"Batch ranking request failed ({result['error']}) - ranking those articles individually")
+        for article_id, ranking in result['rankings'].items():
+            row, state = by_id[article_id]
+            ranking_cache.put(state["text"], RANKING_VERSION, ranking)
+            report = {**token_reduction(state["text"], truncate_head_tail(state["text"], RANKING_BATCH_ARTICLE_TOKENS)),
+                      'mode': "batch", 'route': llm.model_name}
+            record = finalize_ranked_article(row, {**state, "ranking": ranking, "ranking_report": report,
+                                                   "ranking_route": llm.model_name}, token_report)
+            if record:
+                processed.append(record)
+        unranked.extend(by_id[article_id] for article_id in result['missing'])
+        done += len(result['rankings']) + len(result['missing'])
+        progress.progress(done / len(pending), text=f"Ranked {len(processed)}/{len(pending)} articles in batches")
+    
+    st.info(f"📦 Batched ranking: {len(pending) - len(unranked)} articles scored with {requests_made} requests"
+            f" ({batch_size} per request, {len(pending) - len(uncached)} from the ranking cache);"
+            f" {len(unranked)} left for individual ranking")
+    return unranked, processed
+
+
+def rank_pending_articles(pending, max_concurrency, batch_size, token_report=None, expected=None):
+    """
+    Rank (row, state) pairs - batched first if enabled, then individually via the agent.
+    
+    pending may be a lazy iterable (e.g. fed by the article downloads): in
+    individual mode each article is ranked as soon as it is produced. Batched
+    mode needs the whole list up front.
+    
+    Args:
+        expected (int): Number of articles for the progress bar, if pending has no len()
+    """
+    processed = []
+    if batch_size > 1:
+        pending = list(pending)
+    total = len(pending) if hasattr(pending, "__len__") else expected
+    progress = st.progress(0.0, text=f"Ranking {total or ''} articles...")
+    
+    if batch_size > 1:
+        # Several articles per request; anything a batch fails to score is ranked on its own below
+        pending, processed = process_articles_batched(pending, batch_size, max_concurrency, progress, token_report)
+        if not pending:
+            return processed
+        total = len(pending)
+    
+    rows = []  # Filled as states are handed to the agent, so indexes line up with arrival order
+    
+    def _states():
+        for row, state in pending:
+            rows.append(row)
+            yield state
+    
+    for done, (index, result_state, error, elapsed) in enumerate(
+            rank_concurrently(agent, _states(), max_concurrency=max_concurrency), start=1):
+        row = rows[index]
+        if error:
+            st.error(f"Error processing article '{row.get('Title', 'Unknown')}': {error}")
+        else:
             try:
-                ranking = json.loads(ranking)
+                record = finalize_ranked_article(row, result_state, token_report)
             except Exception as e:
-                st.warning(f"Failed to parse ranking JSON for {row.get('Title', 'Unknown')}: {e}")
-                ranking = {}
-        
-        # Ensure ranking values are integers
-        result_state["digital_transformation"] = int(ranking.get("Digital Transformation", 0))
-        result_state["generative_ai"] = int(ranking.get("Generative AI", 0))
-        result_state["machine_learning"] = int(ranking.get("Machine Learning / Data Science", 0))
-        result_state["finance_in_tech"] = int(ranking.get("Finance in tech", 0))
-        
-        # Validate final result
-        required_fields = ["url", "Title", "timestamp", "source", "text"]
-        for field in required_fields:
-            if field not in result_state or result_state[field] is None:
-                st.error(f"Missing required field '{field}' for article: {row.get('Title', 'Unknown')}")
-                return None
-        
-        return result_state
-        
+                st.error(f"Error processing article '{row.get('Title', 'Unknown')}': {e}")
+                record = None
+            if record:
+                processed.append(record)
+        total = max(total or 0, len(rows))
+        progress.progress(min(1.0, done / total), text=f"Ranked {done}/{total} articles ({elapsed:.1f}s)")
+    
+    return processed
+
+
+def llm_queue_section():
+    """Scheduler metrics: queue depth, waits and rate-limit retries per model."""
+    metrics = llm_scheduler.metrics()
+    if not metrics:
+        return
+    rate_limited = sum(row['rate_limited'] for row in metrics)
+    with st.expander(f"🚦 LLM queue: {sum(row['queued'] for row in metrics)} waiting,"
+                     f" {sum(row['in_flight'] for row in metrics)} in flight, {rate_limited} rate-limited since startup"):
+        st.dataframe(pd.DataFrame(metrics))
+
+def process_articles(rows_with_text, max_concurrency=RANKING_MAX_CONCURRENCY, batch_size=RANKING_BATCH_SIZE, tier="full_text",
+                     expected=None):
+    """
+    Rank many articles concurrently with the LangGraph agent, reporting each
+    one as it completes. Articles whose normalized text is identical are
+    ranked once and the copies reuse that score.
+    
+    Args:
+        rows_with_text (iterable): (feed row, article text) pairs - a generator
+                                   is consumed lazily, so ranking starts with the first article
+        max_concurrency (int): Ranking calls in flight at once
+        batch_size (int): Articles packed into one ranking request (1 = one request per article)
+        tier (str): Recorded with each score - which text the ranking was based on
+        expected (int): Number of articles for the progress bar when rows_with_text is a generator
+    
+    Returns:
+        list: Records ready to persist
+    """
+    copies = []  # (row, state, URL of the article with the same text)
+    first_url_by_hash = {}
+    
+    def _pending():
+        for row, article_text in rows_with_text:
+            if not article_text:
+                st.warning(f"No content retrieved for: {row.get('Title', 'Unknown')}")
+                continue
+            try:
+                state = build_article_state(row, article_text, tier=tier)
+            except Exception as e:
+                st.error(f"Error preparing article '{row.get('Title', 'Unknown')}': {e}")
+                continue
+            key = content_hash(article_text)
+            if key in first_url_by_hash:
+                copies.append((row, state, first_url_by_hash[key]))
+            else:
+                first_url_by_hash[key] = row["URL"]
+                yield row, state
+    
+    if hasattr(rows_with_text, "__len__"):
+        if not rows_with_text:
+            return []
+        expected = len(rows_with_text)
+    
+    token_report = []
+    processed = rank_pending_articles(_pending(), max_concurrency, batch_size, token_report, expected=expected)
+    if not first_url_by_hash:
+        return []  # No article had any text
+    
+    ranking_by_url = {record["url"]: record.get("ranking", {}) for record in processed}
+    for row, state, original_url in copies:
+        if original_url in ranking_by_url:
+            report = {**token_savings(estimate_tokens(state["text"]), 0), 'mode': "copy"}
+            record = finalize_ranked_article(row, {**state, "ranking": ranking_by_url[original_url], "ranking_report": report}, token_report)
+            if record:
+                processed.append(record)
+    
+    if token_report:
+        report_df = pd.DataFrame(token_report)
+        with st.expander(f"🧮 Ranking input: ~{int(report_df['tokens'].sum()):,} article tokens sent,"
+                         f" ~{int(report_df['tokens_saved'].sum()):,} saved (budget {RANKING_MAX_TOKENS:,} per prompt)"):
+            st.dataframe(report_df[['Title', 'mode', 'original_tokens', 'tokens', 'tokens_saved', 'saved_pct']])
+        
+        latency = latency_report(token_report)
+        if latency:
+            overall = latency[-1]
+            with st.expander(f"⏱️ Ranking latency: p50 {overall['p50_s']}s, p95 {overall['p95_s']}s"
+                             f" over {overall['articles']} articles"):
+                st.dataframe(pd.DataFrame(latency))
+                if 'route_reason' in report_df:
+                    st.dataframe(report_df[['Title', 'route', 'route_reason', 'latency_s']].dropna(subset=['route_reason']))
+    
+    cache_stats = ranking_cache.stats()
+    st.caption(f"🗃️ Ranking cache since startup: {cache_stats['hits']} hits, {cache_stats['misses']} misses;"
+               f" {len(copies)} identical copies in this run reused a score")
+    llm_queue_section()
+    return processed
+
+
+# Summary-first ranking: score the RSS title + summary, fetch the full article only
+# when that score is borderline or high (any topic >= RANKING_SUMMARY_ESCALATE_SCORE)
+RANKING_SUMMARY_FIRST = os.getenv("RANKING_SUMMARY_FIRST", "false").lower() in ("1", "true", "yes")
+RANKING_SUMMARY_ESCALATE_SCORE = int(os.getenv("RANKING_SUMMARY_ESCALATE_SCORE", "4"))
+RANKING_SUMMARY_MIN_CHARS = int(os.getenv("RANKING_SUMMARY_MIN_CHARS", "80"))
+
+def plain_summary(title, summary):
+    """Title and RSS summary as plain text (summaries often carry HTML)."""
+    summary = BeautifulSoup(summary or "", "html.parser").get_text(" ", strip=True)
+    return f"{title or ''}\n\n{summary}".strip()
+
+def summary_text(row):
+    """Title and plain-text RSS summary - the input for the summary tier."""
+    return plain_summary(row.get("Title"), row.get("Summary"))
+
+def rank_summaries_first(rows):
+    """
+    First tier: rank articles from their RSS title and summary only.
+    
+    Articles whose summary scores low on every topic keep that score and are
+    never downloaded. Borderline/high scorers, failures and articles whose
+    summary is too short to judge go on to the full-text tier.
+    
+    Returns:
+        tuple: (final summary-tier records, rows that need full-text ranking)
+    """
+    candidates, escalate = [], []
+    for row in rows:
+        text = summary_text(row)
+        if len(text) - len(row.get('Title', '')) < RANKING_SUMMARY_MIN_CHARS:
+            escalate.append(row)
+        else:
+            candidates.append((row, text))
+    
+    if not candidates:
+        return [], escalate
+    
+    st.write(f"📰 Summary tier: ranking {len(candidates)} articles from their RSS summaries")
+    records_by_url = {record["url"]: record for record in process_articles(candidates, tier="summary")}
+    
+    final = []
+    for row, _ in candidates:
+        record = records_by_url.get(row["URL"])
+        # A failed ranking still yields a record (all scores 0) - its ranking dict is empty or incomplete
+        if (record is None or ranking_problem(record.get("ranking") or {})
+                or max(record[field] for field in SCORE_FIELDS) >= RANKING_SUMMARY_ESCALATE_SCORE):
+            escalate.append(row)
+        else:
+            final.append(record)
+    
+    st.write(f"- Settled on the summary: {len(final)}; going on to full text: {len(escalate)}")
+    return final, escalate
+
+
+# Near-duplicate detection: the same story from several feeds is ranked once
+NEAR_DUPLICATE_ENABLED = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() in ("1", "true", "yes")
+NEAR_DUPLICATE_DAYS = int(os.getenv("NEAR_DUPLICATE_DAYS", "7"))
+NEAR_DUPLICATE_CORPUS_TTL_SECONDS = int(os.getenv("NEAR_DUPLICATE_CORPUS_TTL_SECONDS", "900"))
+
+@st.cache_data(show_spinner=False, ttl=NEAR_DUPLICATE_CORPUS_TTL_SECONDS)
+def get_recent_corpus(days_back=NEAR_DUPLICATE_DAYS):
+    """Title, summary and scores of the articles ranked in the last days_back days."""
+    cutoff = format_utc_timestamp(pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=days_back))
+    names = {'#u': 'url', '#t': 'Title', '#s': 'summary', '#ts': 'timestamp'}
+    for i, field in enumerate(SCORE_FIELDS):
+        names[f'#f{i}'] = field
+    scan_kwargs = {
+        'FilterExpression': Attr('timestamp').gte(cutoff),
+        'ProjectionExpression': ", ".join(names),
+        'ExpressionAttributeNames': names,
+    }
+    items = []
+    while True:
+        response = table.scan(**scan_kwargs)
+        items.extend(response.get('Items', []))
+        if not response.get('LastEvaluatedKey'):
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return items
+
+def inherit_ranking(row, ranking, source_url):
+    """Record for a near-duplicate that takes over the scores of source_url."""
+    state = build_article_state(row, summary_text(row), tier="near_duplicate")
+    state.update({"ranking": dict(ranking), "duplicate_of": source_url})
+    return finalize_ranked_article(row, state)
+
+def collapse_near_duplicates(rows):
+    """
+    Cluster new articles by MinHash/LSH similarity of their title and summary,
+    against each other and against recently ranked articles.
+    
+    Returns:
+        tuple: (representative rows to rank,
+                records for articles that inherit a stored article's scores,
+                [(row, representative URL)] to inherit scores after ranking)
+    """
+    try:
+        corpus = get_recent_corpus()
     except Exception as e:
-        st.error(f"Error processing article '{row.get('Title', 'Unknown')}': {e}")
-        st.error(f"Error details: {traceback.format_exc()}")
-        return None
+        st.warning(f"Could not load recent articles for near-duplicate detection: {e}")
+        corpus = []
+    
+    corpus_by_url = {item['url']: item for item in corpus if item.get('url')}
+    rows_by_url = {row["URL"]: row for row in rows}
+    corpus_matches, clusters = cluster_near_duplicates(
+        [(row["URL"], summary_text(row)) for row in rows],
+        [(url, plain_summary(item.get('Title'), item.get('summary'))) for url, item in corpus_by_url.items()]
+    )
+    
+    inherited = []
+    for url, (corpus_url, _) in corpus_matches.items():
+        item = corpus_by_url[corpus_url]
+        ranking = {topic: int(item.get(field, 0) or 0) for topic, field in zip(RANKING_TOPICS, SCORE_FIELDS)}
+        record = inherit_ranking(rows_by_url[url], ranking, corpus_url)
+        if record:
+            inherited.append(record)
+    
+    representatives = [rows_by_url[cluster[0]] for cluster in clusters]
+    followers = [(rows_by_url[url], cluster[0]) for cluster in clusters for url in cluster[1:]]
+    
+    if corpus_matches or followers:
+        with st.expander(f"🧬 Near-duplicates: {len(corpus_matches)} match stored articles, "
+                         f"{len(followers)} repeat another new article - {len(representatives)} left to rank "
+                         f"(similarity ≥ {NEAR_DUPLICATE_THRESHOLD:.0%})"):
+            lines = [f"- {rows_by_url[url]['Title']} → stored: {corpus_by_url[corpus_url].get('Title', corpus_url)} ({similarity:.0%})"
+                     for url, (corpus_url, similarity) in corpus_matches.items()]
+            lines += [f"- {row['Title']} → {rows_by_url[representative]['Title']}" for row, representative in followers]
+            st.markdown("\n".join(lines))
+    return representatives, inherited, followers
 
 
 def debug_dynamodb_connection():
@@ -634,6 +1181,7 @@ def persist_knowledge_base_dynamodb(knowledge_base):
     try:
         saved_count = 0
         failed_count = 0
+        saved_urls = []
         
         # Save articles one by one (more reliable than batch for debugging)
         for i, article in enumerate(knowledge_base):
@@ -655,6 +1203,7 @@ def persist_knowledge_base_dynamodb(knowledge_base):
                 # Save individual item
                 table.put_item(Item=cleaned_article)
                 saved_count += 1
+                saved_urls.append(cleaned_article.get('url'))
                 
                 # Show progress for first few items
                 if i < 5:
@@ -666,6 +1215,9 @@ def persist_knowledge_base_dynamodb(knowledge_base):
                 failed_count += 1
                 st.error(f"Failed to save article {i+1}: {item_error}")
         
+        # Keep the local known-URL index in step with the table
+        known_url_index.add_many(saved_urls)
+        
         # Report results
         if saved_count > 0:
             st.success(f"✅ Successfully saved {saved_count} articles to DynamoDB!")
@@ -692,6 +1244,124 @@ def persist_knowledge_base_dynamodb(knowledge_base):
         st.error(f"Full error details: {traceback.format_exc()}")
         return False
 
+# Per-feed ETag / Last-Modified validators for conditional GET requests
+feed_validators = FeedValidatorStore()
+
+# On-disk snapshots of parsed feed entries - a restarted process serves these right away
+FEED_SNAPSHOT_DIR = os.getenv("FEED_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "feeds"))
+FEED_SNAPSHOT_TTL_SECONDS = int(os.getenv("FEED_SNAPSHOT_TTL_SECONDS", "3600"))
+feed_snapshots = FeedSnapshotCache(FEED_SNAPSHOT_DIR, default_ttl=FEED_SNAPSHOT_TTL_SECONDS)
+
+# Per-feed polling schedule learned from publish cadence, latency and errors
+feed_scheduler = FeedScheduler(os.path.join(FEED_SNAPSHOT_DIR, "scheduler.json"))
+
+# How long the assembled feed DataFrame is cached - matches the scheduler's shortest poll interval
+FEED_CACHE_TTL_SECONDS = int(os.getenv("FEED_CACHE_TTL_SECONDS", "900"))
+
+# Guards the background refresh of stale feed snapshots
+_feed_refresh_lock = threading.Lock()
+
+# Concurrent feed collection settings
+FEED_FETCH_MAX_WORKERS = int(os.getenv("FEED_FETCH_MAX_WORKERS", "8"))
+FEED_FETCH_DEADLINE_SECONDS = float(os.getenv("FEED_FETCH_DEADLINE_SECONDS", "30"))
+
+def save_feed_snapshot(feed_url, source_name, entries):
+    """Persist the latest entries of a feed to disk; failures are logged, never raised."""
+    etag, last_modified = feed_validators.get_validators(feed_url)
+    try:
+        feed_snapshots.save(feed_url, source_name, entries, etag=etag, last_modified=last_modified)
+    except Exception as e:
+        print(f"⚠️ Could not save feed snapshot for {source_name}: {e}")
+
+def load_feed_snapshots(feed_sources):
+    """
+    Split feeds into those that can be served from disk and those that must be fetched.
+    A feed without a snapshot is only fetched when the scheduler says it is due, so a
+    feed that has never worked still gets error backoff (reported as "BACKOFF").
+    
+    Returns:
+        tuple: (snapshot_entries, snapshot_report, stale_feeds, missing_feeds)
+    """
+    snapshot_entries = []
+    snapshot_report = []
+    stale_feeds = {}
+    missing_feeds = {}
+    now = time.time()  # Same clock as FeedSnapshotCache and FeedScheduler
+    
+    for url, source_name in feed_sources.items():
+        snapshot = feed_snapshots.load(url)
+        if not snapshot or not snapshot["entries"]:
+            if feed_scheduler.is_due(url, now=now):
+                missing_feeds[url] = source_name
+            else:
+                state = feed_scheduler.feed_state(url)
+                snapshot_report.append({
+                    "source": source_name,
+                    "url": url,
+                    "status": "BACKOFF",
+                    "entries": 0,
+                    "seconds": 0.0,
+                    "error": f"{state.get('last_error') or 'No entries'} - retrying in "
+                             f"{max(0, state.get('next_poll', now) - now) / 60:.0f} min"
+                             f" ({state.get('consecutive_errors', 0)} consecutive errors)",
+                })
+            continue
+        
+        # The scheduler decides when a known feed is due; fall back to the snapshot TTL otherwise
+        if feed_scheduler.knows(url):
+            fresh = not feed_scheduler.is_due(url, now=now)
+        else:
+            fresh = feed_snapshots.is_fresh(snapshot, now=now)
+        if not fresh:
+            stale_feeds[url] = source_name
+        snapshot_entries.extend(snapshot["entries"])
+        snapshot_report.append({
+            "source": source_name,
+            "url": url,
+            "status": "CACHED" if fresh else "STALE",
+            "entries": len(snapshot["entries"]),
+            "seconds": 0.0,
+            "error": None,
+        })
+    
+    return snapshot_entries, snapshot_report, stale_feeds, missing_feeds
+
+def refresh_feeds_in_background(feed_sources):
+    """Re-fetch stale feeds on a daemon thread; fetch_feed writes the new snapshots."""
+    if not feed_sources or not _feed_refresh_lock.acquire(blocking=False):
+        return False
+    
+    def _refresh():
+        try:
+            _, feed_report = collect_feeds(
+                feed_sources,
+                fetch_feed_scheduled,
+                max_workers=FEED_FETCH_MAX_WORKERS,
+                deadline=FEED_FETCH_DEADLINE_SECONDS
+            )
+            refreshed = sum(1 for r in feed_report if r["status"] == "OK")
+            print(f"🔄 Background refresh: {refreshed}/{len(feed_sources)} stale feeds updated")
+            # Let the next run rebuild the DataFrame from the new snapshots
+            get_all_feeds.clear()
+        except Exception as e:
+            print(f"❌ Background feed refresh failed: {e}")
+        finally:
+            _feed_refresh_lock.release()
+    
+    threading.Thread(target=_refresh, name="feed-snapshot-refresh", daemon=True).start()
+    return True
+
+def fetch_feed_scheduled(feed_url, source_name):
+    """Run fetch_feed and feed the outcome into the adaptive polling scheduler."""
+    start = time.perf_counter()
+    try:
+        entries = fetch_feed(feed_url, source_name)
+    except Exception as e:
+        feed_scheduler.record_failure(feed_url, time.perf_counter() - start, error=e)
+        raise
+    feed_scheduler.record_success(feed_url, entries, time.perf_counter() - start)
+    return entries
+
 def fetch_feed(feed_url, source_name):
     """
     Enhanced fetch_feed function with better error handling and timeout.
@@ -703,8 +1373,25 @@ def fetch_feed(feed_url, source_name):
         'Accept-Language': 'en-US,en;q=0.9'
     }
     
+    # After a restart, pick up the validators persisted with the last snapshot
+    snapshot = feed_snapshots.load(feed_url)
+    if snapshot:
+        feed_validators.seed(feed_url, snapshot.get("etag"), snapshot.get("last_modified"), snapshot["entries"])
+    
+    # Conditional GET - only download the feed body if it changed since the last fetch
+    headers.update(feed_validators.conditional_headers(feed_url))
+    
     try:
-        response = requests.get(feed_url, headers=headers, timeout=20)
+        response = http_get(feed_url, headers=headers, timeout=20)
+        if response.status_code == 304:
+            cached_entries = feed_validators.get_entries(feed_url)
+            if cached_entries is not None:
+                print(f"♻️ {source_name}: not modified, reusing {len(cached_entries)} cached entries")
+                save_feed_snapshot(feed_url, source_name, cached_entries)
+                return cached_entries
+            # Validators without entries should not happen - fall back to a full download
+            feed_validators.discard(feed_url)
+            response = http_get(feed_url, headers={k: v for k, v in headers.items() if not k.startswith('If-')}, timeout=20)
         response.raise_for_status()
         content = response.content
     except requests.exceptions.Timeout:
@@ -753,6 +1440,8 @@ def fetch_feed(feed_url, source_name):
                 "Original Date": date_created  # Keep for debugging
             })
         
+        feed_validators.update(feed_url, response.headers, entries)
+        save_feed_snapshot(feed_url, source_name, entries)
         return entries
         
     except Exception as e:
@@ -842,15 +1531,24 @@ def fetch_feed(feed_url, source_name):
 #         print("❌ No articles retrieved from any feed")
     
 #     return df
-@st.cache_data(show_spinner=False, ttl=3600)  # Cache expires after 1 hour (3600 seconds)
-def get_all_feeds():
+@st.cache_data(show_spinner=False, ttl=FEED_CACHE_TTL_SECONDS)  # Per-feed polling is decided by feed_scheduler
+def get_all_feeds(force_refresh=False):
     """
     Production-ready feed sources - all verified working as of May 22, 2025.
     Total: 12 reliable feeds providing ~700+ articles
-    NOTE: Cache expires every hour to ensure fresh data
-    """
-    all_entries = []
+    NOTE: The DataFrame cache expires every FEED_CACHE_TTL_SECONDS; each feed is
+    only re-fetched when the adaptive scheduler says it is due
+    
+    Feeds with a fresh on-disk snapshot are served from disk, stale snapshots are
+    served immediately and refreshed in the background, and only feeds without
+    any snapshot are fetched before returning.
     
+    Args:
+        force_refresh (bool): Fetch every feed now instead of serving snapshots
+    
+    Returns:
+        tuple: (DataFrame of unique articles, per-feed timing report)
+    """
     # TIER 1: Premium AI/Tech News (High frequency, high quality)
     tier1_feeds = {
         "https://www.theverge.com/rss/ai-artificial-intelligence/index.xml": "The Verge AI",
@@ -885,40 +1583,73 @@ def get_all_feeds():
     current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
     print(f"🔄 FRESH RSS FEED FETCH - Starting collection from {len(all_feed_sources)} sources...")
     print(f"🕐 Fetch time: {current_time}")
-    print(f"💾 Cache TTL: 1 hour - Next refresh after: {(datetime.utcnow() + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    print(f"💾 Cache TTL: {FEED_CACHE_TTL_SECONDS // 60} minutes - Next refresh after: {(datetime.utcnow() + timedelta(seconds=FEED_CACHE_TTL_SECONDS)).strftime('%Y-%m-%d %H:%M:%S UTC')}")
     
-    for url, source_name in all_feed_sources.items():
-        try:
-            entries = fetch_feed(url, source_name)
-            if entries:  # Only add if we got entries
-                all_entries.extend(entries)
-                successful_feeds += 1
-                print(f"✅ {source_name}: {len(entries)} entries")
-            else:
-                print(f"⚠️ {source_name}: No entries found")
-                failed_feeds += 1
-        except Exception as e:
-            print(f"❌ {source_name}: {str(e)}")
+    # Serve what we can from the on-disk snapshots first
+    if force_refresh:
+        all_entries, snapshot_report, stale_feeds = [], [], {}
+        feeds_to_fetch = all_feed_sources
+    else:
+        all_entries, snapshot_report, stale_feeds, feeds_to_fetch = load_feed_snapshots(all_feed_sources)
+        if stale_feeds and refresh_feeds_in_background(stale_feeds):
+            print(f"♻️ Serving {len(stale_feeds)} stale snapshots while refreshing them in the background")
+    
+    # Fetch the remaining feeds concurrently - total time is bounded by the slowest feed (or the deadline)
+    collection_start = datetime.utcnow()
+    fetched_entries, fetch_report = collect_feeds(
+        feeds_to_fetch,
+        fetch_feed_scheduled,
+        max_workers=FEED_FETCH_MAX_WORKERS,
+        deadline=FEED_FETCH_DEADLINE_SECONDS
+    )
+    collection_seconds = (datetime.utcnow() - collection_start).total_seconds()
+    all_entries.extend(fetched_entries)
+    
+    # If a forced fetch failed, fall back to the last good snapshot of that feed
+    if force_refresh:
+        for feed_result in fetch_report:
+            if feed_result["status"] != "OK":
+                snapshot = feed_snapshots.load(feed_result["url"])
+                if snapshot and snapshot["entries"]:
+                    all_entries.extend(snapshot["entries"])
+                    feed_result["status"] = "STALE"
+                    feed_result["entries"] = len(snapshot["entries"])
+    
+    feed_order = {url: i for i, url in enumerate(all_feed_sources)}
+    feed_report = sorted(snapshot_report + fetch_report, key=lambda r: feed_order[r["url"]])
+    
+    for feed_result in feed_report:
+        if feed_result["status"] == "OK":
+            successful_feeds += 1
+            print(f"✅ {feed_result['source']}: {feed_result['entries']} entries ({feed_result['seconds']:.2f}s)")
+        elif feed_result["status"] in ("CACHED", "STALE"):
+            successful_feeds += 1
+            print(f"💾 {feed_result['source']}: {feed_result['entries']} entries from {feed_result['status'].lower()} snapshot")
+        elif feed_result["status"] == "BACKOFF":
             failed_feeds += 1
-            continue
+            print(f"⏳ {feed_result['source']}: not polled - {feed_result['error']}")
+        elif feed_result["status"] == "EMPTY":
+            failed_feeds += 1
+            print(f"⚠️ {feed_result['source']}: No entries found ({feed_result['seconds']:.2f}s)")
+        else:
+            failed_feeds += 1
+            print(f"❌ {feed_result['source']}: {feed_result['error']} ({feed_result['seconds']:.2f}s)")
     
     print(f"\n📊 Fresh Feed Collection Summary:")
     print(f"   ✅ Successful: {successful_feeds}")
     print(f"   ❌ Failed: {failed_feeds}")
     print(f"   📄 Total articles fetched: {len(all_entries)}")
+    print(f"   ⏱️ Collection time: {collection_seconds:.2f}s")
     
     # Convert to DataFrame and process
     df = pd.DataFrame(all_entries)
     if not df.empty:
         df = df[["RSS Source", "Title", "URL", "Summary", "Date Created"]]
         
-        # Sort by date (most recent first)
-        try:
-            df['Date Created'] = pd.to_datetime(df['Date Created'], errors='coerce')
-            df = df.sort_values('Date Created', ascending=False)
-            df['Date Created'] = df['Date Created'].dt.strftime('%Y-%m-%dT%H:%M:%SZ')
-        except Exception as e:
-            print(f"⚠️ Date sorting error: {e}")
+        # One batched conversion to a native datetime64[ns, UTC] column - kept as-is
+        # from here to display, so sorting and filtering never round-trip through strings
+        df['Date Created'] = to_utc_datetime(df['Date Created'])
+        df = df.sort_values('Date Created', ascending=False, na_position='last')
         
         # Remove duplicates by URL (in case feeds overlap)
         original_count = len(df)
@@ -931,8 +1662,7 @@ def get_all_feeds():
         # Enhanced date range analysis
         if not df.empty:
             try:
-                df_dates = pd.to_datetime(df['Date Created'], errors='coerce')
-                df_dates = df_dates.dropna()
+                df_dates = df['Date Created'].dropna()
                 if not df_dates.empty:
                     newest = df_dates.max()
                     oldest = df_dates.min()
@@ -958,7 +1688,12 @@ def get_all_feeds():
     else:
         print("❌ No articles retrieved from any feeds")
     
-    return df
+    return df, feed_report
+
+def load_rss_feeds():
+    """Load the RSS feeds into session state, honouring a pending forced refresh."""
+    force_refresh = st.session_state.pop("force_feed_refresh", False)
+    st.session_state.rss_df, st.session_state.feed_report = get_all_feeds(force_refresh=force_refresh)
 
 # ---------------------------
 # DATABASE MANAGEMENT SECTION
@@ -975,6 +1710,8 @@ def database_management_section():
     if "last_updated" in st.session_state:
         st.write(f"Last updated: {st.session_state.last_updated}")
     
+    pre_ranker_section(articles)
+    
     # # Load RSS feeds if not already loaded
     # if "rss_df" not in st.session_state:
     #     st.session_state.rss_df = get_all_feeds()
@@ -1108,7 +1845,7 @@ def database_management_section():
     #         else:
     #             st.info("No new articles found.")
     if "rss_df" not in st.session_state:
-        st.session_state.rss_df = get_all_feeds()
+        load_rss_feeds()
 
     df = st.session_state.rss_df
 
@@ -1138,6 +1875,10 @@ def database_management_section():
                 get_all_feeds.clear()
             if "rss_df" in st.session_state:
                 del st.session_state.rss_df
+            if "feed_report" in st.session_state:
+                del st.session_state.feed_report
+            # Bypass the on-disk snapshots on the next load
+            st.session_state.force_feed_refresh = True
             st.success("RSS cache cleared!")
             st.info("Click 'Check for New Articles' to fetch fresh data")
             st.rerun()
@@ -1147,7 +1888,7 @@ def database_management_section():
             with st.spinner("Checking feeds for new articles..."):
                 # Force reload RSS feeds if needed
                 if "rss_df" not in st.session_state:
-                    st.session_state.rss_df = get_all_feeds()
+                    load_rss_feeds()
                 
                 df = st.session_state.rss_df
                 
@@ -1155,16 +1896,21 @@ def database_management_section():
                 st.write(f"📡 **RSS Data Info:**")
                 st.write(f"- Total articles in RSS feeds: {len(df)}")
                 
+                if st.session_state.get("feed_report"):
+                    with st.expander("Feed fetch timings"):
+                        st.dataframe(pd.DataFrame(st.session_state.feed_report))
+                    with st.expander("Feed polling schedule"):
+                        feed_sources = {r["url"]: r["source"] for r in st.session_state.feed_report}
+                        st.dataframe(pd.DataFrame(feed_scheduler.report(feed_sources)))
+                
                 if not df.empty:
                     # Show date range of RSS articles
                     try:
-                        df_copy = df.copy()
-                        df_copy['Date Created'] = pd.to_datetime(df_copy['Date Created'], errors='coerce')
-                        df_copy = df_copy.dropna(subset=['Date Created'])
+                        rss_dates = df['Date Created'].dropna()
                         
-                        if not df_copy.empty:
-                            newest_rss = df_copy['Date Created'].max()
-                            oldest_rss = df_copy['Date Created'].min()
+                        if not rss_dates.empty:
+                            newest_rss = rss_dates.max()
+                            oldest_rss = rss_dates.min()
                             days_since_newest = (pd.Timestamp.utcnow() - newest_rss).days
                             
                             st.write(f"- RSS date range: {oldest_rss.strftime('%Y-%m-%d')} to {newest_rss.strftime('%Y-%m-%d')}")
@@ -1177,79 +1923,38 @@ def database_management_section():
                     except Exception as e:
                         st.warning(f"Could not analyze RSS dates: {e}")
                 
-                # Initialize list to store new articles (metadata only, no processing yet)
-                new_articles = []
-                
-                # Check each article in the RSS feed against the database
-                for idx, row in df.iterrows():
-                    article_url = row["URL"]
-                    
-                    # Check if the article already exists in DynamoDB using the primary key (url)
-                    try:
-                        existing_response = table.get_item(Key={'url': article_url})
-                        
-                        # If article doesn't exist, add to the new articles list
-                        if 'Item' not in existing_response:
-                            new_articles.append(row.to_dict())
-                        else:
-                            # Article exists, skip it
-                            continue
-                            
-                    except Exception as e:
-                        st.error(f"Error checking for existing article {article_url}: {e}")
-                        continue
+                # Date cutoff first, then the database check only for the surviving URLs
+                try:
+                    recent_df, new_df, lookup_stats = find_new_articles(df, days_back=days_filter)
+                except Exception as e:
+                    st.error(f"Error checking for existing articles: {e}")
+                    recent_df, new_df, lookup_stats = df.iloc[0:0], df.iloc[0:0], None
                 
                 st.write(f"📊 **Database Comparison:**")
-                st.write(f"- Articles not yet in database: {len(new_articles)}")
+                st.write(f"- Articles from the last {days_filter} days: {len(recent_df)} (skipped {len(df) - len(recent_df)} older articles)")
+                if lookup_stats:
+                    st.write(f"- Skipped via local index: {lookup_stats['known_locally']} known URLs, checked {lookup_stats['checked_remotely']} in DynamoDB")
+                st.write(f"- Recent articles not yet in database: {len(new_df)}")
                 
-                # Apply date filtering BEFORE processing
-                if new_articles:
-                    # Convert DataFrame rows to the format expected by filter function
-                    articles_for_filtering = []
-                    for article in new_articles:
-                        articles_for_filtering.append({
-                            'Date Created': article['Date Created'],
-                            'Title': article['Title'],
-                            'URL': article['URL'],
-                            'Summary': article['Summary'],
-                            'RSS Source': article['RSS Source']
-                        })
-                    
-                    # Apply date filter
-                    filtered_articles = filter_articles_by_date(articles_for_filtering, days_back=days_filter)
-                    
-                    # Convert back to the format expected by the rest of the app
-                    st.session_state.new_articles = []
-                    for filtered_article in filtered_articles:
-                        # Find the original row that matches this filtered article
-                        for original_article in new_articles:
-                            if original_article['URL'] == filtered_article['URL']:
-                                st.session_state.new_articles.append(original_article)
-                                break
+                # Rows stay keyed by URL from the DataFrame - nothing needs re-matching
+                st.session_state.new_articles = new_df.to_dict("records")
+                
+                # Show results
+                if st.session_state.new_articles:
+                    st.success(f"✅ Found {len(st.session_state.new_articles)} recent articles (last {days_filter} days)!")
+                    st.info(f"💰 Cost savings: Filtered out {len(df) - len(recent_df)} older articles before any database lookup")
                     
-                    # Show results
-                    if st.session_state.new_articles:
-                        st.success(f"✅ Found {len(st.session_state.new_articles)} recent articles (last {days_filter} days)!")
-                        st.info(f"💰 Cost savings: Filtered out {len(new_articles) - len(st.session_state.new_articles)} older articles")
-                        
-                        # Show sample of what will be processed
-                        if len(st.session_state.new_articles) > 0:
-                            st.write("📋 Recent articles to process:")
-                            sample_df = pd.DataFrame(st.session_state.new_articles[:5])  # Show first 5
-                            st.dataframe(sample_df[['RSS Source', 'Title', 'Date Created']])
-                            if len(st.session_state.new_articles) > 5:
-                                st.write(f"... and {len(st.session_state.new_articles) - 5} more recent articles")
-                    else:
-                        st.info(f"ℹ️ Found {len(new_articles)} new articles, but none from the last {days_filter} days.")
-                        if len(new_articles) > 0:
-                            st.write("💡 **Suggestion:** Try expanding the date range to capture older articles, or check if RSS feeds are updating properly.")
-                            # Show sample of new articles that were filtered out
-                            st.write("📋 Sample new articles (outside date range):")
-                            sample_df = pd.DataFrame(new_articles[:3])
-                            st.dataframe(sample_df[['RSS Source', 'Title', 'Date Created']])
+                    # Show sample of what will be processed
+                    st.write("📋 Recent articles to process:")
+                    st.dataframe(new_df.head(5)[['RSS Source', 'Title', 'Date Created']])
+                    if len(new_df) > 5:
+                        st.write(f"... and {len(new_df) - 5} more recent articles")
+                elif recent_df.empty:
+                    st.info(f"ℹ️ No RSS articles from the last {days_filter} days.")
+                    st.write("💡 **Suggestion:** Try expanding the date range to capture older articles, or check if RSS feeds are updating properly.")
                 else:
                     st.info("ℹ️ No new articles found.")
-                    st.write("**This means all RSS articles are already in your database.**")
+                    st.write(f"**This means all RSS articles from the last {days_filter} days are already in your database.**")
                     st.write("💡 **Suggestions:**")
                     st.write("- RSS feeds may not have published new content since your last run")
                     st.write("- Try clicking '🔄 Force Refresh RSS' to clear cache and fetch fresh data")
@@ -1259,16 +1964,63 @@ def database_management_section():
     if "new_articles" in st.session_state and st.session_state.new_articles:
         if st.button("Process and Save Articles"):
             with st.spinner("Processing articles with AI..."):
-                knowledge_base = []
+                extraction_report = []
+                
+                # Cheap local pass first - clearly off-topic articles are never downloaded or ranked
+                articles_to_rank, skipped = prerank_articles(st.session_state.new_articles)
+                if skipped:
+                    with st.expander(f"🚫 Pre-ranker skipped {len(skipped)} of {len(st.session_state.new_articles)} articles (score < {PRERANK_THRESHOLD})"):
+                        st.dataframe(pd.DataFrame(
+                            [{'Title': row.get('Title', 'Unknown'), 'RSS Source': row.get('RSS Source'), 'Pre-rank score': round(score, 3)}
+                             for row, score in skipped]
+                        ))
+                elif not pre_ranker.is_trained:
+                    st.caption("ℹ️ Pre-ranker not trained yet (Database Management) - ranking every article")
                 
-                # Process each new article
-                for row in st.session_state.new_articles:
-                    processed = process_article(row)
-                    if processed:
-                        knowledge_base.append(processed)
+                # One representative per near-duplicate cluster; the rest inherit its scores
+                inherited_records, followers = [], []
+                if NEAR_DUPLICATE_ENABLED and articles_to_rank:
+                    articles_to_rank, inherited_records, followers = collapse_near_duplicates(articles_to_rank)
+                
+                # Summary tier first - low scorers never cost a download or a full-text call
+                summary_records = []
+                if RANKING_SUMMARY_FIRST:
+                    summary_records, articles_to_rank = rank_summaries_first(articles_to_rank)
+                
+                # Download article bodies concurrently (politely per host); each body
+                # is handed to the ranking pool the moment it arrives
+                def fetched_articles():
+                    for row, fetched, fetch_error in fetch_articles(articles_to_rank, fetch_fn=download_article):
+                        if fetch_error:
+                            st.warning(f"Could not fetch '{row.get('Title', 'Unknown')}': {fetch_error}")
+                            continue
+                        article_text, reduction = fetched
+                        extraction_report.append({'Title': row.get('Title', 'Unknown'), **reduction})
+                        article_cache.put(row["URL"], article_text)
+                        yield row, article_text
+                
+                knowledge_base = summary_records
+                if articles_to_rank:
+                    knowledge_base = knowledge_base + process_articles(fetched_articles(), expected=len(articles_to_rank))
+                
+                ranking_by_url = {record["url"]: record.get("ranking", {}) for record in knowledge_base}
+                for row, representative_url in followers:
+                    if representative_url in ranking_by_url:
+                        record = inherit_ranking(row, ranking_by_url[representative_url], representative_url)
+                        if record:
+                            inherited_records.append(record)
+                knowledge_base += inherited_records
                 
                 st.session_state.knowledge_base = knowledge_base
                 
+                # Boilerplate stripping - tokens no longer sent to the LLM per article
+                if extraction_report:
+                    report_df = pd.DataFrame(extraction_report)
+                    total_before = int(report_df['original_tokens'].sum())
+                    total_saved = int(report_df['tokens_saved'].sum())
+                    with st.expander(f"✂️ Main-content extraction saved ~{total_saved:,} of {total_before:,} input tokens"):
+                        st.dataframe(report_df[['Title', 'original_tokens', 'tokens', 'tokens_saved', 'saved_pct', 'main_content', 'bytes', 'stop_reason']])
+                
                 # Show success message
                 if knowledge_base:
                     st.success(f"Successfully processed {len(knowledge_base)} articles.")
@@ -1439,9 +2191,10 @@ def content_creation_section():
 
     col6, col7 = st.columns([1, 1])    
     with col6:
-        st.text_area("Full Article Text", selected_article["text"], height=800)
         article_url = selected_article["url"]
-        article_text = get_article_text(article_url)
+        article_text = get_cached_article_text(article_url, fallback_text=selected_article.get("text"),
+                                               summary_only=selected_article.get("ranking_tier") in SUMMARY_ONLY_TIERS)
+        st.text_area("Full Article Text", article_text, height=800)
         if not article_text:
             st.error("Failed to retrieve article content.")
         else:
@@ -1469,12 +2222,7 @@ def content_creation_section():
                     
                     st.info("Calling the language model for content generation...")
                     try:
-                        client = OpenAI()
-                        response = client.chat.completions.create(
-                            model="o4-mini",
-                            messages=st.session_state.conversation_thread,
-                            max_completion_tokens=10000
-                        )
+                        response = create_chat_completion(st.session_state.conversation_thread)
                         llm_output = response.choices[0].message.content.strip()
                         
                         # Add assistant response to conversation thread
@@ -1551,12 +2299,7 @@ def content_creation_section():
                         with st.spinner("Processing your request..."):
                             try:
                                 # Call OpenAI with the full conversation history
-                                client = OpenAI()
-                                response = client.chat.completions.create(
-                                    model="o4-mini",
-                                    messages=st.session_state.conversation_thread,
-                                    max_completion_tokens=10000
-                                )
+                                response = create_chat_completion(st.session_state.conversation_thread)
                                 
                                 # Get the refined content
                                 refined_content = response.choices[0].message.content.strip()
@@ -1607,12 +2350,7 @@ def content_creation_section():
                                 ]
                                 
                                 # Call OpenAI for review
-                                client = OpenAI()
-                                response = client.chat.completions.create(
-                                    model="o4-mini",
-                                    messages=review_prompt,
-                                    max_completion_tokens=10000
-                                )
+                                response = create_chat_completion(review_prompt)
                                 
                                 # Display the review
                                 review_result = response.choices[0].message.content.strip()
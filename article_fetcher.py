@@ -0,0 +1,276 @@
+import codecs
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+from extraction_pool import extract_from_bytes, get_extraction_pool
+from http_client import http_get
+
+ARTICLE_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; MyRSSReader/1.0)'}
+
+# Concurrency and politeness limits for article downloads
+ARTICLE_FETCH_MAX_WORKERS = int(os.getenv("ARTICLE_FETCH_MAX_WORKERS", "16"))
+ARTICLE_FETCH_PER_HOST = int(os.getenv("ARTICLE_FETCH_PER_HOST", "2"))
+ARTICLE_FETCH_HOST_DELAY = float(os.getenv("ARTICLE_FETCH_HOST_DELAY", "1.0"))
+
+# Keep only the article body (drops cookie banners, newsletter boxes, footers...)
+ARTICLE_MAIN_CONTENT_ONLY = os.getenv("ARTICLE_MAIN_CONTENT_ONLY", "true").lower() in ("1", "true", "yes")
+
+# Per-fetch budget: never hold more than ARTICLE_MAX_BYTES of a page, stop once
+# ARTICLE_ENOUGH_CHARS of paragraph text has arrived, give up after the deadline
+ARTICLE_MAX_BYTES = int(os.getenv("ARTICLE_MAX_BYTES", str(2 * 1024 * 1024)))
+ARTICLE_ENOUGH_CHARS = int(os.getenv("ARTICLE_ENOUGH_CHARS", "100000"))
+ARTICLE_DOWNLOAD_DEADLINE = float(os.getenv("ARTICLE_DOWNLOAD_DEADLINE", "30"))
+ARTICLE_CHUNK_SIZE = 16 * 1024
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "application/xml", "text/xml")
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9._:-]+)""", re.I)
+PARAGRAPH_MARKER_RE = re.compile(rb"<(/?)p[\s>/]", re.I)
+TAG_RE = re.compile(rb"<[^>]*>")
+
+
+def _resolve_encoding(content_type, first_chunk):
+    """Charset from the Content-Type header, else from a <meta> tag near the top, else UTF-8."""
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            candidate = value.strip().strip("'\"")
+            break
+    else:
+        match = META_CHARSET_RE.search(first_chunk[:4096])
+        candidate = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return codecs.lookup(candidate).name
+    except LookupError:
+        return "utf-8"
+
+
+class ParagraphTextCounter:
+    """
+    Cheap running estimate of <p> text in a page as its raw bytes arrive: two
+    C-level regex passes per chunk, no decoding and no HTML parsing. Only
+    used to decide when to stop reading, so tags split across chunks or
+    multi-byte characters throwing the count off by a few bytes don't matter.
+    """
+
+    def __init__(self):
+        self.chars = 0
+        self.in_paragraph = False
+        self._carry = b""
+
+    def feed(self, chunk):
+        data = self._carry + chunk
+        # Markers are at most 4 bytes: hold back 3 so one split across chunks is seen whole next time
+        cut = max(0, len(data) - 3)
+        position = 0
+        for match in PARAGRAPH_MARKER_RE.finditer(data):
+            if match.start() >= cut:
+                break
+            if self.in_paragraph:
+                self.chars += len(TAG_RE.sub(b"", data[position:match.start()]))
+            self.in_paragraph = not match.group(1)
+            position = match.start()
+        if self.in_paragraph:
+            self.chars += len(TAG_RE.sub(b"", data[position:cut]))
+        self._carry = data[cut:]
+        return self.chars
+
+
+def read_bounded(response, max_bytes=ARTICLE_MAX_BYTES, enough_chars=ARTICLE_ENOUGH_CHARS,
+                 deadline=ARTICLE_DOWNLOAD_DEADLINE):
+    """
+    Read a streamed response body without ever holding more than max_bytes.
+
+    The Content-Type is checked before any of the body is read, so PDFs,
+    images and other binaries are rejected up front. The body is kept as raw
+    bytes - nothing is decoded or parsed while reading. A ParagraphTextCounter
+    estimates the <p> text seen so far straight from the bytes, and the
+    extractor parses the whole body once afterwards. Reading stops as soon as
+    the estimate reaches enough_chars, the byte budget is spent or the overall
+    deadline passes (a per-read timeout can't catch a slow drip).
+
+    Args:
+        response: requests Response opened with stream=True
+        max_bytes (int): Maximum decompressed body bytes to keep
+        enough_chars (int): Stop after this many characters of <p> text
+        deadline (float): Maximum seconds spent reading the body
+
+    Returns:
+        tuple: (content bytes, encoding, stop_reason) - stop_reason is one of
+               'complete', 'enough_text', 'max_bytes', 'deadline'
+
+    Raises:
+        ValueError: If the response is not an HTML/text document
+    """
+    content_type = response.headers.get("Content-Type", "")
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type and media_type not in HTML_CONTENT_TYPES:
+        raise ValueError(f"Unsupported content type '{media_type}'")
+
+    declared_length = response.headers.get("Content-Length", "")
+    if declared_length.isdigit() and int(declared_length) > max_bytes:
+        print(f"⚠️ {response.url} declares {int(declared_length):,} bytes - reading only the first {max_bytes:,}")
+
+    started = time.monotonic()
+    chunks = []
+    size = 0
+    encoding = None
+    counter = ParagraphTextCounter()
+    stop_reason = "complete"
+
+    for chunk in response.iter_content(chunk_size=ARTICLE_CHUNK_SIZE):
+        if not chunk:
+            continue
+        chunk = chunk[:max_bytes - size]
+        chunks.append(chunk)
+        size += len(chunk)
+
+        if encoding is None:
+            encoding = _resolve_encoding(content_type, chunk)
+
+        if size >= max_bytes:
+            stop_reason = "max_bytes"
+            break
+        if counter.feed(chunk) >= enough_chars:
+            stop_reason = "enough_text"
+            break
+        if time.monotonic() - started > deadline:
+            stop_reason = "deadline"
+            break
+
+    if encoding is None:
+        return b"", "utf-8", stop_reason
+    return b"".join(chunks), encoding, stop_reason
+
+
+def download_article(url, timeout=10, main_content=ARTICLE_MAIN_CONTENT_ONLY):
+    """
+    Fetch an article and extract its text.
+    Raises on any network or HTTP error (no UI side effects, safe in worker threads).
+
+    Args:
+        url (str): Article URL
+        timeout (int): Request timeout in seconds
+        main_content (bool): Keep only the article body instead of every <p>
+
+    Returns:
+        tuple: (text, report) - report is the token reduction vs. all <p> text,
+               plus the bytes read and why reading stopped (see read_bounded)
+    """
+    response = http_get(url, headers=ARTICLE_HEADERS, timeout=timeout, stream=True)
+    try:
+        response.raise_for_status()
+        content, encoding, stop_reason = read_bounded(response)
+    finally:
+        response.close()
+
+    # Parsing is CPU-bound: hand the raw bytes to the process pool when one is configured
+    pool = get_extraction_pool()
+    if pool:
+        text, report = pool.extract(content, encoding, main_content)
+    else:
+        text, report = extract_from_bytes(content, encoding, main_content)
+    report['bytes'] = len(content)
+    report['stop_reason'] = stop_reason
+    return text, report
+
+
+def download_article_text(url, timeout=10):
+    """Fetch an article and return its text (see download_article)."""
+    return download_article(url, timeout=timeout)[0]
+
+
+class HostThrottle:
+    """
+    Per-host politeness: at most `per_host` requests in flight to the same host,
+    and at least `min_delay` seconds between the starts of two requests to it.
+    """
+
+    def __init__(self, per_host=ARTICLE_FETCH_PER_HOST, min_delay=ARTICLE_FETCH_HOST_DELAY):
+        self.per_host = max(1, per_host)
+        self.min_delay = max(0.0, min_delay)
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.Semaphore(self.per_host)
+            return self._semaphores[host]
+
+    def acquire(self, host):
+        self._semaphore(host).acquire()
+        # Reserve the next start slot for this host, then wait for it outside the lock
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start_at + self.min_delay
+        wait = start_at - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def release(self, host):
+        self._semaphore(host).release()
+
+
+def _interleave_by_host(rows):
+    """Round-robin rows across hosts so one busy publisher can't occupy every worker."""
+    by_host = {}
+    for row in rows:
+        by_host.setdefault(urlparse(str(row.get("URL", ""))).netloc.lower(), []).append(row)
+    queues = list(by_host.values())
+    interleaved = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        interleaved.extend(q[i] for q in queues if i < len(q))
+    return interleaved
+
+
+def fetch_articles(rows, fetch_fn=download_article_text, max_workers=ARTICLE_FETCH_MAX_WORKERS,
+                   per_host=ARTICLE_FETCH_PER_HOST, min_host_delay=ARTICLE_FETCH_HOST_DELAY):
+    """
+    Download article bodies concurrently and yield them as they arrive.
+
+    A global worker cap bounds total concurrency; a HostThrottle keeps each
+    publisher to `per_host` parallel requests spaced `min_host_delay` apart,
+    so 50 TechCrunch links don't hit techcrunch.com all at once.
+
+    Args:
+        rows (list): Feed rows (dicts with a 'URL' key)
+        fetch_fn (callable): Function url -> article text (or any result); may raise
+        max_workers (int): Maximum downloads in flight overall
+        per_host (int): Maximum downloads in flight per host
+        min_host_delay (float): Minimum seconds between request starts per host
+
+    Yields:
+        tuple: (row, fetch_fn result, error) - error is None on success
+    """
+    if not rows:
+        return
+
+    throttle = HostThrottle(per_host=per_host, min_delay=min_host_delay)
+
+    def _fetch(row):
+        url = row.get("URL")
+        if not url or not str(url).startswith("http"):
+            return row, "", f"Invalid URL: {url}"
+        host = urlparse(url).netloc.lower()
+        throttle.acquire(host)
+        try:
+            return row, fetch_fn(url), None
+        except Exception as e:
+            return row, "", str(e)
+        finally:
+            throttle.release(host)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(rows))))
+    try:
+        futures = [executor.submit(_fetch, row) for row in _interleave_by_host(rows)]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # If the consumer stops early, don't start the remaining downloads
+        executor.shutdown(wait=False, cancel_futures=True)
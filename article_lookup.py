@@ -0,0 +1,77 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# DynamoDB allows at most 100 keys per BatchGetItem request
+BATCH_GET_MAX_KEYS = 100
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _batch_get_existing(client, table_name, urls, max_retries):
+    """
+    Run one BatchGetItem for up to 100 URLs, retrying UnprocessedKeys with
+    exponential backoff. Only the key attribute is projected.
+    """
+    request_items = {
+        table_name: {
+            'Keys': [{'url': url} for url in urls],
+            'ProjectionExpression': '#u',
+            'ExpressionAttributeNames': {'#u': 'url'},
+        }
+    }
+    found = set()
+    attempt = 0
+
+    while request_items:
+        response = client.batch_get_item(RequestItems=request_items)
+        for item in response.get('Responses', {}).get(table_name, []):
+            found.add(item['url'])
+
+        request_items = response.get('UnprocessedKeys') or {}
+        if not request_items:
+            break
+
+        attempt += 1
+        if attempt > max_retries:
+            remaining = len(request_items.get(table_name, {}).get('Keys', []))
+            raise RuntimeError(f"{remaining} keys still unprocessed after {max_retries} retries")
+        # Throttled - back off before asking for the rest
+        time.sleep(min(5.0, 0.05 * 2 ** attempt) * random.uniform(0.5, 1.5))
+
+    return found
+
+
+def find_existing_urls(table, urls, max_workers=4, max_retries=5):
+    """
+    Return the subset of urls that already exist in the DynamoDB table.
+
+    Keys are checked in BatchGetItem chunks of 100, with the chunks sent in
+    parallel, so checking ~700 feed entries takes a handful of round trips
+    instead of one GetItem per entry.
+
+    Args:
+        table: boto3 DynamoDB Table resource keyed by 'url'
+        urls (iterable): Article URLs to check
+        max_workers (int): Number of batches in flight at once
+        max_retries (int): Retries per batch for UnprocessedKeys
+
+    Returns:
+        set: URLs that are already stored
+    """
+    unique_urls = list(dict.fromkeys(url for url in urls if url))
+    if not unique_urls:
+        return set()
+
+    client = table.meta.client
+    batches = list(_chunks(unique_urls, BATCH_GET_MAX_KEYS))
+    existing = set()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+        for found in executor.map(lambda batch: _batch_get_existing(client, table.name, batch, max_retries), batches):
+            existing.update(found)
+
+    return existing
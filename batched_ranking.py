@@ -0,0 +1,141 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html import escape
+
+from langchain.prompts import PromptTemplate
+from langchain.schema import HumanMessage
+
+from prompts import BATCH_RANKING_PROMPT, RANKING_TOPICS
+from token_utils import estimate_tokens, truncate_head_tail
+
+# Articles per ranking request (1 = one request per article through the agent)
+RANKING_BATCH_SIZE = int(os.getenv("RANKING_BATCH_SIZE", "1"))
+# Each article is trimmed to this many tokens before it is packed into a batch
+RANKING_BATCH_ARTICLE_TOKENS = int(os.getenv("RANKING_BATCH_ARTICLE_TOKENS", "1500"))
+
+batch_prompt = PromptTemplate(input_variables=["articles"], template=BATCH_RANKING_PROMPT)
+
+
+def strip_code_fences(raw):
+    """Remove a ```json ... ``` wrapper from an LLM response."""
+    raw = raw.strip()
+    if raw.startswith("```"):
+        raw = raw.replace("```", "").strip()
+        if raw.lower().startswith("json"):
+            raw = raw[len("json"):].strip()
+    return raw
+
+
+def build_batch_prompt(articles, article_tokens=RANKING_BATCH_ARTICLE_TOKENS):
+    """
+    Pack several articles into one ranking prompt.
+
+    Args:
+        articles (list): (article id, text) pairs - ids must be unique within the batch
+        article_tokens (int): Per-article token budget
+
+    Returns:
+        str: The prompt text
+    """
+    blocks = [
+        f'<article id="{escape(str(article_id))}">\n{truncate_head_tail(text, article_tokens)}\n</article>'
+        for article_id, text in articles
+    ]
+    return batch_prompt.format(articles="\n\n".join(blocks))
+
+
+def parse_batch_response(raw, expected_ids):
+    """
+    Parse the JSON array returned for a batch.
+
+    Returns:
+        tuple: ({article id: {topic: score}}, [ids that did not come back with all four scores])
+
+    Raises:
+        ValueError: If the response is not a JSON array
+    """
+    data = json.loads(strip_code_fences(raw))
+    if isinstance(data, dict):
+        # Some responses wrap the array, e.g. {"articles": [...]}
+        data = next((value for value in data.values() if isinstance(value, list)), None)
+    if not isinstance(data, list):
+        raise ValueError("Batch ranking response is not a JSON array")
+
+    expected = {str(article_id) for article_id in expected_ids}
+    rankings = {}
+    for item in data:
+        if not isinstance(item, dict) or str(item.get("id")) not in expected:
+            continue
+        try:
+            scores = {topic: max(0, min(15, int(item[topic]))) for topic in RANKING_TOPICS}
+        except (KeyError, TypeError, ValueError):
+            continue  # Incomplete entry - treated as missing
+        rankings[str(item["id"])] = scores
+
+    missing = [article_id for article_id in expected_ids if str(article_id) not in rankings]
+    return rankings, missing
+
+
+def rank_batch(llm, articles, article_tokens=RANKING_BATCH_ARTICLE_TOKENS):
+    """
+    Score several articles with one LLM request.
+
+    Args:
+        llm: Chat model (anything with .invoke([messages]))
+        articles (list): (article id, text) pairs
+        article_tokens (int): Per-article token budget
+
+    Returns:
+        dict: rankings ({id: {topic: score}}), missing (ids without a valid
+              score), prompt_tokens (estimate), requests and error (None on success)
+    """
+    ids = [article_id for article_id, _ in articles]
+    prompt = build_batch_prompt(articles, article_tokens)
+    result = {'rankings': {}, 'missing': ids, 'prompt_tokens': estimate_tokens(prompt), 'requests': 1, 'error': None}
+    try:
+        raw = llm.invoke([HumanMessage(content=prompt)]).content
+        result['rankings'], result['missing'] = parse_batch_response(raw, ids)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def rank_in_batches(llm, articles, batch_size=RANKING_BATCH_SIZE, max_concurrency=4,
+                    article_tokens=RANKING_BATCH_ARTICLE_TOKENS):
+    """
+    Split articles into batches, rank the batches in parallel and yield each
+    batch result as it completes. Ids missing from a batch response are
+    retried once in a batch of their own; anything still missing is left for
+    the caller to rank individually.
+
+    Args:
+        llm: Chat model
+        articles (list): (article id, text) pairs
+        batch_size (int): Articles per request
+        max_concurrency (int): Batch requests in flight
+        article_tokens (int): Per-article token budget
+
+    Yields:
+        dict: One rank_batch result per batch (see rank_batch)
+    """
+    if not articles:
+        return
+    batch_size = max(1, batch_size)
+    batches = [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
+    texts = dict(articles)
+
+    def _rank(batch):
+        result = rank_batch(llm, batch, article_tokens)
+        if result['missing'] and len(batch) > 1:
+            retry = rank_batch(llm, [(article_id, texts[article_id]) for article_id in result['missing']], article_tokens)
+            result['rankings'].update(retry['rankings'])
+            result['missing'] = retry['missing']
+            result['prompt_tokens'] += retry['prompt_tokens']
+            result['requests'] += retry['requests']
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(batches)))) as executor:
+        futures = [executor.submit(_rank, batch) for batch in batches]
+        for future in as_completed(futures):
+            yield future.result()
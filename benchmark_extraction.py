@@ -0,0 +1,165 @@
+import argparse
+import glob
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from extraction_pool import ExtractionPool, available_cpus, extract_from_bytes
+from html_extract import BACKENDS, extract_article, extract_with_full_soup
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+
+# Markup where a backend has been seen to differ from full_soup - checked on every run
+REGRESSION_CASES = [
+    ("block_in_p", "<p>text<div>block</div>more</p>"),
+    ("list_in_p", "<p>intro<ul><li>item</li></ul>tail</p>"),
+    ("table_in_p", "<p>a<table><tr><td>cell</td></tr></table>b</p>"),
+    ("pre_in_p", "<p>a<pre> </pre>b</p>"),
+    ("after_html", "<html><body><p>in</p></body></html><p>after</p>"),
+    ("cdata", "<p>x<![CDATA[hidden]]>y</p>"),
+    ("div_closes_p", "<div><p>x &amp; y<br>z</div><p>q"),
+]
+
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    """
+    Return [(name, html)] for every page in the fixture directory - the
+    bundled *_style.html pages are synthetic (see fixtures/pages/README.md),
+    pages added with --save are real.
+    """
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def save_pages(urls, fixture_dir=FIXTURE_DIR):
+    """Download pages into the fixture corpus so the benchmark runs on real publisher markup."""
+    from article_fetcher import ARTICLE_HEADERS
+    from http_client import http_get
+
+    os.makedirs(fixture_dir, exist_ok=True)
+    for url in urls:
+        try:
+            response = http_get(url, headers=ARTICLE_HEADERS, timeout=15)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"❌ {url}: {e}")
+            continue
+        host = urlparse(url).netloc.replace("www.", "").replace(".", "_")
+        name = f"{host}_{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}.html"
+        with open(os.path.join(fixture_dir, name), "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"💾 Saved {url} -> {name} ({len(response.text) / 1024:.0f} KB)")
+
+
+def benchmark_backends(pages, iterations=20):
+    """
+    Time every extraction backend on the corpus and check its output against
+    the original full-tree BeautifulSoup extraction, on the corpus and on
+    REGRESSION_CASES.
+
+    Returns:
+        list: One dict per backend with ms_per_page, speedup and mismatched pages
+    """
+    checked = list(pages) + REGRESSION_CASES
+    reference = {name: extract_with_full_soup(html) for name, html in checked}
+    results = []
+
+    for backend, extract in BACKENDS.items():
+        mismatches = [name for name, html in checked if extract(html) != reference[name]]
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for _, html in pages:
+                extract(html)
+        elapsed = time.perf_counter() - start
+        results.append({
+            'backend': backend,
+            'ms_per_page': elapsed * 1000 / (iterations * len(pages)),
+            'mismatches': mismatches,
+        })
+
+    baseline = next(r['ms_per_page'] for r in results if r['backend'] == "full_soup")
+    for result in results:
+        result['speedup'] = baseline / result['ms_per_page'] if result['ms_per_page'] else 0.0
+    return results
+
+
+def benchmark_pool(pages, processes, batch_size=100, threads=16):
+    """
+    Extract a batch of pages the way the fetch stage does (many download
+    threads handing bytes over) - once in-thread, once through a process pool.
+
+    Returns:
+        dict: seconds for each mode and the speedup
+    """
+    batch = [html.encode("utf-8") for _, html in pages]
+    batch = (batch * (batch_size // len(batch) + 1))[:batch_size]
+
+    def run(extract):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(extract, batch))
+        return time.perf_counter() - start
+
+    in_thread = run(lambda content: extract_from_bytes(content, "utf-8"))
+
+    pool = ExtractionPool(processes)
+    try:
+        pool.extract(batch[0], "utf-8")  # Start the workers outside the timing
+        pooled = run(lambda content: pool.extract(content, "utf-8"))
+    finally:
+        pool.shutdown()
+
+    return {'in_thread': in_thread, 'pooled': pooled, 'speedup': in_thread / pooled if pooled else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark article HTML extraction backends")
+    parser.add_argument("--iterations", type=int, default=20, help="Passes over the corpus per backend")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="Directory of saved .html pages")
+    parser.add_argument("--save", nargs="+", metavar="URL", help="Download pages into the corpus first")
+    parser.add_argument("--processes", type=int, default=available_cpus(),
+                        help="Worker processes for the process-pool benchmark (default: available cores)")
+    parser.add_argument("--batch", type=int, default=100, help="Pages per batch for the process-pool benchmark")
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save, args.fixtures)
+
+    pages = load_fixtures(args.fixtures)
+    if not pages:
+        print(f"No .html fixtures found in {args.fixtures}")
+        return
+
+    total_kb = sum(len(html) for _, html in pages) / 1024
+    print(f"📄 {len(pages)} pages, {total_kb:.0f} KB total, {args.iterations} iterations\n")
+    print(f"{'Backend':<12} {'ms/page':>10} {'speedup':>9}  Output")
+    print("-" * 50)
+    for result in sorted(benchmark_backends(pages, args.iterations), key=lambda r: r['ms_per_page']):
+        if result['mismatches']:
+            output = f"differs on {', '.join(result['mismatches'])}"
+        else:
+            output = "identical"
+        print(f"{result['backend']:<12} {result['ms_per_page']:>10.2f} {result['speedup']:>8.1f}x  {output}")
+
+    print(f"\n{'Page':<40} {'all <p>':>9} {'main':>7} {'saved':>7}")
+    print("-" * 66)
+    for name, html in pages:
+        _, report = extract_article(html)
+        main = report['tokens'] if report['main_content'] else "fallback"
+        print(f"{name[:40]:<40} {report['original_tokens']:>9} {main:>7} {report['saved_pct']:>6.1f}%")
+
+    if args.processes > 1:
+        result = benchmark_pool(pages, args.processes, batch_size=args.batch)
+        print(f"\n⚙️ Batch of {args.batch} pages: {result['in_thread']:.2f}s in-thread, "
+              f"{result['pooled']:.2f}s with {args.processes} processes ({result['speedup']:.1f}x)")
+    else:
+        print(f"\n⚙️ Skipping the process-pool benchmark ({available_cpus()} core available)")
+
+
+if __name__ == "__main__":
+    main()
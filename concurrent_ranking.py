@@ -0,0 +1,49 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Ranking calls in flight at once (each one is an LLM round trip)
+RANKING_MAX_CONCURRENCY = int(os.getenv("RANKING_MAX_CONCURRENCY", "8"))
+
+
+def rank_concurrently(agent, states, max_concurrency=RANKING_MAX_CONCURRENCY):
+    """
+    Run the compiled ranking agent over article states as they arrive and
+    yield each result as soon as it completes.
+
+    states may be a lazy iterable (e.g. article bodies still being
+    downloaded): each state is submitted the moment it is produced, finished
+    rankings are yielded between arrivals, and the rest once the input is
+    exhausted. At most max_concurrency invocations run in parallel, so a
+    pipeline takes about as long as its slowest fetch plus one ranking
+    rather than all fetches followed by all rankings. Runs no UI code -
+    callers render progress from the main thread as results arrive.
+
+    Args:
+        agent: Compiled LangGraph graph (any Runnable)
+        states (iterable): Input states, one per article
+        max_concurrency (int): Maximum invocations in flight
+
+    Yields:
+        tuple: (index of the state in arrival order, result state or None, error or None, seconds since start)
+    """
+    started = time.monotonic()
+
+    def _outcome(index, future):
+        elapsed = time.monotonic() - started
+        error = future.exception()
+        if error is not None:
+            return index, None, str(error) or type(error).__name__, elapsed
+        return index, future.result(), None, elapsed
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        running = {}
+        for index, state in enumerate(states):
+            running[executor.submit(agent.invoke, state)] = index
+            finished, _ = wait(running, timeout=0, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield _outcome(running.pop(future), future)
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield _outcome(running.pop(future), future)
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from feed_cache import atomic_write_json
+
+
+class ContentCache:
+    """
+    Article text cache keyed by URL: an in-memory LRU in front of an optional
+    on-disk tier.
+
+    Both tiers honour a TTL. The memory tier is bounded by entry count and
+    total characters; the disk tier by total bytes, evicting the least
+    recently written files first. Disk hits are promoted back into memory.
+    """
+
+    def __init__(self, max_entries=256, max_chars=64 * 1024 * 1024, ttl=7 * 24 * 60 * 60,
+                 disk_dir=None, disk_max_bytes=512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # url -> (stored_at, text)
+        self._memory_chars = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _disk_path(self, url):
+        return os.path.join(self.disk_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _remember(self, url, stored_at, text):
+        """Insert into the memory LRU and evict down to the limits (lock must be held)."""
+        if url in self._memory:
+            self._memory_chars -= len(self._memory.pop(url)[1])
+        self._memory[url] = (stored_at, text)
+        self._memory_chars += len(text)
+        while self._memory and (len(self._memory) > self.max_entries or self._memory_chars > self.max_chars):
+            _, (_, evicted_text) = self._memory.popitem(last=False)
+            self._memory_chars -= len(evicted_text)
+
+    def get(self, url):
+        """Return cached text for url, or None on a miss."""
+        if not url:
+            return None
+        now = time.time()
+
+        with self._lock:
+            cached = self._memory.get(url)
+            if cached:
+                stored_at, text = cached
+                if not self._expired(stored_at, now):
+                    self._memory.move_to_end(url)
+                    return text
+                self._memory_chars -= len(self._memory.pop(url)[1])
+
+        if not self.disk_dir:
+            return None
+
+        path = self._disk_path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if record.get("url") != url or self._expired(record.get("stored_at", 0), now):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        with self._lock:
+            self._remember(url, record["stored_at"], record["text"])
+        return record["text"]
+
+    def put(self, url, text):
+        """Store text for url in memory and (if configured) on disk."""
+        if not url or not text:
+            return
+        stored_at = time.time()
+
+        with self._lock:
+            self._remember(url, stored_at, text)
+
+        if not self.disk_dir:
+            return
+        try:
+            atomic_write_json(self._disk_path(url), {"url": url, "stored_at": stored_at, "text": text})
+            self._enforce_disk_limit()
+        except Exception as e:
+            print(f"⚠️ Could not write article cache entry for {url}: {e}")
+
+    def _enforce_disk_limit(self):
+        files = []
+        total = 0
+        for entry in os.scandir(self.disk_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.disk_max_bytes:
+            return
+        for _, size, path in sorted(files):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.disk_max_bytes:
+                break
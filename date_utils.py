@@ -1,103 +1,222 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 import re
+import time
 from dateutil import parser
 
-def parse_rss_date(date_str):
+# Timezone abbreviations seen in our feeds (offsets in hours from UTC)
+TZ_OFFSETS = {
+    'GMT': 0, 'UT': 0, 'UTC': 0, 'Z': 0,
+    'EST': -5, 'EDT': -4,
+    'CST': -6, 'CDT': -5,
+    'MST': -7, 'MDT': -6,
+    'PST': -8, 'PDT': -7,
+}
+
+# Same offsets for dateutil, which otherwise ignores EDT/EST and returns a naive time
+DATEUTIL_TZINFOS = {name: hours * 3600 for name, hours in TZ_OFFSETS.items()}
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+ISO_OUTPUT_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Fast-path shapes (precompiled once at import)
+# RFC 2822: "Thu, 22 May 2025 09:00:03 GMT", "Tue, 20 May 2025 09:45:00 +0000", "Mon, 19 May 2025 13:20:26 EDT"
+RFC2822_RE = re.compile(
+    r'^(?:[A-Za-z]{3},\s*)?(\d{1,2})\s+([A-Za-z]{3})\s+(\d{4})\s+'
+    r'(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([+-]\d{4}|[A-Za-z]{1,3})?$'
+)
+# ISO 8601: "2025-05-22T08:58:34-04:00", "2025-05-22T12:05:34Z", "2025-05-22T12:05:34.123+00:00"
+ISO8601_RE = re.compile(
+    r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?$'
+)
+
+# Legacy fallback shapes
+ISO_Z_RE = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z')
+ISO_OFFSET_RE = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}')
+RFC2822_GMT_RE = re.compile(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} GMT')
+RFC2822_UTC_OFFSET_RE = re.compile(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} \+0000')
+RFC2822_EDT_RE = re.compile(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} EDT')
+RFC2822_EST_RE = re.compile(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} EST')
+RFC2822_PDT_OFFSET_RE = re.compile(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} -0700')
+RFC2822_ANY_OFFSET_RE = re.compile(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} \+\d{4}')
+
+
+def _to_utc_iso(parsed_date):
+    """Format a datetime as ISO 8601 UTC; naive datetimes are assumed to be UTC already."""
+    if parsed_date.tzinfo is not None:
+        parsed_date = parsed_date.astimezone(timezone.utc)
+    return parsed_date.strftime(ISO_OUTPUT_FORMAT)
+
+
+def _parse_fast(date_str):
     """
-    Parse various RSS date formats into a standard ISO format.
-    Enhanced based on analysis of all 12 working feeds.
-    
-    Handles formats from:
-    - The Verge: 2025-05-22T08:58:34-04:00
-    - DeepMind/Google: Tue, 20 May 2025 09:45:00 +0000  
-    - Harvard: 2025-05-22T12:05:34Z
-    - Guardian: Thu, 22 May 2025 09:00:03 GMT + 2025-05-22T09:00:03Z
-    - OpenAI: Thu, 22 May 2025 00:00:00 GMT
-    - ScienceDaily: Mon, 19 May 2025 13:20:26 EDT
-    - MIT Tech Review: Thu, 22 May 2025 12:10:00 +0000
-    - TechCrunch: Thu, 22 May 2025 14:00:00 +0000
-    - VentureBeat: Thu, 22 May 2025 14:00:00 +0000
-    - NYTimes: Thu, 22 May 2025 09:03:18 +0000
-    
-    Args:
-        date_str (str): Date string from RSS feed
+    Parse the RFC 2822 and ISO 8601 shapes our feeds actually use without dateutil.
     
     Returns:
-        str: Standardized ISO 8601 date string (YYYY-MM-DDTHH:MM:SSZ)
+        str or None: ISO 8601 UTC string, or None if the shape is not recognised
     """
-    if not date_str or date_str == 'No Date':
-        return datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+    match = RFC2822_RE.match(date_str)
+    if match:
+        day, month_name, year, hour, minute, second, zone = match.groups()
+        month = MONTHS.get(month_name.lower())
+        if month is None:
+            return None
+        
+        if not zone:
+            offset_minutes = 0
+        elif zone[0] in '+-':
+            sign = -1 if zone[0] == '-' else 1
+            offset_minutes = sign * (int(zone[1:3]) * 60 + int(zone[3:5]))
+        elif zone.upper() in TZ_OFFSETS:
+            offset_minutes = TZ_OFFSETS[zone.upper()] * 60
+        else:
+            return None
+        
+        try:
+            parsed_date = datetime(int(year), month, int(day), int(hour), int(minute), int(second or 0))
+        except ValueError:
+            return None
+        return (parsed_date - timedelta(minutes=offset_minutes)).strftime(ISO_OUTPUT_FORMAT)
     
-    # Clean the input string
-    date_str = str(date_str).strip()
+    if ISO8601_RE.match(date_str):
+        try:
+            return _to_utc_iso(datetime.fromisoformat(date_str.replace('Z', '+00:00')))
+        except ValueError:
+            return None
+    
+    return None
+
+
+def _parse_with_dateutil(date_str):
+    """
+    General-purpose (slow) parser: dateutil first, then the hand-written formats.
     
+    Returns:
+        str or None: ISO 8601 UTC string, or None if nothing could parse it
+    """
     try:
         # Try dateutil parser first - handles most formats automatically
-        parsed_date = parser.parse(date_str)
+        parsed_date = parser.parse(date_str, tzinfos=DATEUTIL_TZINFOS)
         # Convert to UTC and return ISO format
-        return parsed_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+        return _to_utc_iso(parsed_date)
     except Exception as e:
         # If dateutil fails, try specific format parsing
         try:
             # Format 1: Already in ISO format with Z (Harvard)
-            if re.match(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z', date_str):
+            if ISO_Z_RE.match(date_str):
                 return date_str
             
             # Format 2: ISO format with timezone offset (The Verge)
             # Example: "2025-05-22T08:58:34-04:00"
-            if re.match(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}', date_str):
+            if ISO_OFFSET_RE.match(date_str):
                 parsed_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                return parsed_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+                return _to_utc_iso(parsed_date)
             
             # Format 3: RFC 2822 with GMT (Guardian, OpenAI)
             # Example: "Thu, 22 May 2025 09:00:03 GMT"
-            if re.match(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} GMT', date_str):
+            if RFC2822_GMT_RE.match(date_str):
                 parsed_date = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S GMT')
-                return parsed_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+                return parsed_date.strftime(ISO_OUTPUT_FORMAT)
             
             # Format 4: RFC 2822 with +0000 (Google, DeepMind, TechCrunch, MIT Tech Review, VentureBeat, NYTimes)
             # Example: "Thu, 22 May 2025 09:00:00 +0000"
-            if re.match(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} \+0000', date_str):
+            if RFC2822_UTC_OFFSET_RE.match(date_str):
                 parsed_date = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S +0000')
-                return parsed_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+                return parsed_date.strftime(ISO_OUTPUT_FORMAT)
             
             # Format 5: RFC 2822 with EDT/EST (ScienceDaily)
             # Example: "Mon, 19 May 2025 13:20:26 EDT"
-            if re.match(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} EDT', date_str):
+            if RFC2822_EDT_RE.match(date_str):
                 parsed_date = datetime.strptime(date_str.replace(' EDT', ''), '%a, %d %b %Y %H:%M:%S')
                 # EDT is UTC-4, so add 4 hours to convert to UTC
                 parsed_date = parsed_date + timedelta(hours=4)
-                return parsed_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+                return parsed_date.strftime(ISO_OUTPUT_FORMAT)
             
-            if re.match(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} EST', date_str):
+            if RFC2822_EST_RE.match(date_str):
                 parsed_date = datetime.strptime(date_str.replace(' EST', ''), '%a, %d %b %Y %H:%M:%S')
                 # EST is UTC-5, so add 5 hours to convert to UTC
                 parsed_date = parsed_date + timedelta(hours=5)
-                return parsed_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+                return parsed_date.strftime(ISO_OUTPUT_FORMAT)
             
             # Format 6: VentureBeat sometimes uses PST/PDT (-0700)
-            if re.match(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} -0700', date_str):
+            if RFC2822_PDT_OFFSET_RE.match(date_str):
                 parsed_date = datetime.strptime(date_str.replace(' -0700', ''), '%a, %d %b %Y %H:%M:%S')
                 # PDT is UTC-7, so add 7 hours to convert to UTC
                 parsed_date = parsed_date + timedelta(hours=7)
-                return parsed_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+                return parsed_date.strftime(ISO_OUTPUT_FORMAT)
             
             # Legacy formats from your original system (keeping for compatibility)
-            if re.match(r'\w{3}, \d{2} \w{3} \d{4} \d{2}:\d{2}:\d{2} \+\d{4}', date_str):
+            if RFC2822_ANY_OFFSET_RE.match(date_str):
                 parsed_date = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S +0000')
-                return parsed_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+                return parsed_date.strftime(ISO_OUTPUT_FORMAT)
             
-            # Fallback - use current time but log the issue
-            print(f"⚠️ Unknown date format: '{date_str}' - using current time")
-            return datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+            return None
             
         except Exception as inner_e:
             print(f"❌ Failed to parse date '{date_str}': {inner_e}")
-            return datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+            return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_to_iso(date_str):
+    """Memoized dispatch: fast path for known shapes, dateutil only for the rest."""
+    return _parse_fast(date_str) or _parse_with_dateutil(date_str)
+
+
+def parse_rss_date(date_str):
+    """
+    Parse various RSS date formats into a standard ISO format.
+    Enhanced based on analysis of all 12 working feeds.
+    
+    Handles formats from:
+    - The Verge: 2025-05-22T08:58:34-04:00
+    - DeepMind/Google: Tue, 20 May 2025 09:45:00 +0000  
+    - Harvard: 2025-05-22T12:05:34Z
+    - Guardian: Thu, 22 May 2025 09:00:03 GMT + 2025-05-22T09:00:03Z
+    - OpenAI: Thu, 22 May 2025 00:00:00 GMT
+    - ScienceDaily: Mon, 19 May 2025 13:20:26 EDT
+    - MIT Tech Review: Thu, 22 May 2025 12:10:00 +0000
+    - TechCrunch: Thu, 22 May 2025 14:00:00 +0000
+    - VentureBeat: Thu, 22 May 2025 14:00:00 +0000
+    - NYTimes: Thu, 22 May 2025 09:03:18 +0000
+    
+    RFC 2822 and ISO 8601 strings are parsed by a precompiled fast path;
+    dateutil is only used for unknown shapes. Results are memoized, since
+    feeds repeat the same date strings on every refresh.
+    
+    Args:
+        date_str (str): Date string from RSS feed
+    
+    Returns:
+        str: Standardized ISO 8601 date string in UTC (YYYY-MM-DDTHH:MM:SSZ)
+    """
+    if not date_str or date_str == 'No Date':
+        return datetime.utcnow().strftime(ISO_OUTPUT_FORMAT)
+    
+    # Clean the input string
+    date_str = str(date_str).strip()
+    
+    parsed = _parse_to_iso(date_str)
+    if parsed is None:
+        # Fallback - use current time but log the issue
+        print(f"⚠️ Unknown date format: '{date_str}' - using current time")
+        return datetime.utcnow().strftime(ISO_OUTPUT_FORMAT)
+    return parsed
 
 # Test function to verify all formats work
-def test_all_date_formats():
-    """Test the date parser with all identified formats from the RSS analysis."""
+def test_all_date_formats(benchmark=True, iterations=2000):
+    """
+    Test the date parser with all identified formats from the RSS analysis,
+    then benchmark the old dateutil-first path against the fast path.
+    
+    Args:
+        benchmark (bool): Also run the parses-per-second micro-benchmark
+        iterations (int): Passes over the test cases per benchmark run
+    """
     test_cases = [
         # The Verge AI (ISO with timezone offset)
         ("2025-05-22T08:58:34-04:00", "The Verge"),
@@ -141,7 +260,14 @@ def test_all_date_formats():
     for date_str, source in test_cases:
         try:
             result = parse_rss_date(date_str)
-            print(f"✅ {source:20} | {date_str:35} → {result}")
+            reference = _parse_with_dateutil(date_str)
+            if _parse_fast(date_str) is None:
+                print(f"⚠️ {source:20} | {date_str:35} → {result} (no fast path)")
+            elif result != reference:
+                print(f"❌ {source:20} | {date_str:35} → {result} (dateutil: {reference})")
+                continue
+            else:
+                print(f"✅ {source:20} | {date_str:35} → {result}")
             success_count += 1
         except Exception as e:
             print(f"❌ {source:20} | {date_str:35} → ERROR: {e}")
@@ -149,6 +275,9 @@ def test_all_date_formats():
     print("\n" + "=" * 70)
     print(f"🎯 Results: {success_count}/{total_count} formats parsed successfully!")
     
+    if benchmark:
+        benchmark_date_parsing([date_str for date_str, _ in test_cases], iterations=iterations)
+    
     if success_count == total_count:
         print("🎉 All date formats are working perfectly!")
         return True
@@ -156,5 +285,39 @@ def test_all_date_formats():
         print(f"⚠️ {total_count - success_count} formats failed - check the errors above")
         return False
 
+def benchmark_date_parsing(date_strings, iterations=2000):
+    """
+    Micro-benchmark: parses per second for the old dateutil-first path,
+    the uncached fast path and the memoized parse_rss_date.
+    
+    Args:
+        date_strings (list): Date strings to parse
+        iterations (int): Passes over date_strings per run
+    
+    Returns:
+        dict: Parses per second keyed by parser name
+    """
+    def _rate(parse_fn):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for date_str in date_strings:
+                parse_fn(date_str)
+        elapsed = time.perf_counter() - start
+        return (iterations * len(date_strings)) / elapsed if elapsed > 0 else float('inf')
+    
+    _parse_to_iso.cache_clear()
+    results = {
+        "dateutil (before)": _rate(_parse_with_dateutil),
+        "fast path (no memo)": _rate(lambda d: _parse_fast(d) or _parse_with_dateutil(d)),
+        "parse_rss_date (memo)": _rate(parse_rss_date),
+    }
+    
+    baseline = results["dateutil (before)"]
+    print(f"\n⏱️ Date parsing benchmark ({iterations} x {len(date_strings)} strings):")
+    for name, rate in results.items():
+        print(f"   {name:22} {rate:>12,.0f} parses/s  ({rate / baseline:.1f}x)")
+    
+    return results
+
 if __name__ == "__main__":
     test_all_date_formats()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from html_extract import extract_article, extract_paragraph_text
+from token_utils import token_reduction
+
+# Worker processes for HTML extraction: 0 = extract in the calling thread, "auto" = one per available core
+ARTICLE_EXTRACT_PROCESSES = os.getenv("ARTICLE_EXTRACT_PROCESSES", "0")
+
+
+def available_cpus():
+    """Cores this process may actually run on (respects container CPU affinity)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+def extract_from_bytes(content, encoding=None, main_content=True):
+    """
+    Decode a downloaded page and extract its text. Runs inside a worker
+    process, so it only takes and returns picklable plain data.
+
+    Returns:
+        tuple: (text, report) as from html_extract.extract_article
+    """
+    html = content.decode(encoding or "utf-8", errors="replace") if content else ""
+    if main_content:
+        return extract_article(html)
+    text = extract_paragraph_text(html)
+    report = token_reduction(text, text)
+    report['main_content'] = False
+    return text, report
+
+
+class ExtractionPool:
+    """
+    Long-lived process pool for the CPU-bound HTML parsing step.
+
+    Download threads hand raw bytes to the pool and block on the result, so
+    parsing for a batch spreads across cores instead of queuing behind the
+    GIL. The pool is started lazily, reused for every batch and shut down at
+    interpreter exit. If a worker dies the pool is rebuilt once; after that,
+    extraction falls back to the calling thread.
+    """
+
+    def __init__(self, processes):
+        self.processes = max(1, processes)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._broken = False
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None and not self._broken:
+                # Forking a process that already runs threads (Streamlit) can deadlock;
+                # forkserver starts workers from a clean single-threaded server instead
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                return True
+            return False
+
+    def extract(self, content, encoding=None, main_content=True):
+        """Extract text from raw page bytes in a worker process (see extract_from_bytes)."""
+        for _ in range(2):
+            executor = self._get_executor()
+            if executor is None:
+                break
+            try:
+                return executor.submit(extract_from_bytes, content, encoding, main_content).result()
+            except BrokenProcessPool:
+                if not self._reset(executor):
+                    continue  # Another thread already rebuilt the pool
+        with self._lock:
+            if not self._broken:
+                print("⚠️ HTML extraction pool keeps failing - extracting in-process instead")
+            self._broken = True
+        return extract_from_bytes(content, encoding, main_content)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+def _configured_processes():
+    value = ARTICLE_EXTRACT_PROCESSES.strip().lower()
+    if value == "auto":
+        return available_cpus()
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool():
+    """
+    Shared ExtractionPool sized from ARTICLE_EXTRACT_PROCESSES, or None when
+    extraction should run in the calling thread (the default, and always on
+    single-core hosts where a pool only adds pickling overhead).
+    """
+    global _pool
+    processes = min(_configured_processes(), available_cpus())
+    if processes <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool(processes)
+            atexit.register(_pool.shutdown)
+        return _pool
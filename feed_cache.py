@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temporary file in the same directory and atomically rename it into place."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class FeedValidatorStore:
+    """
+    In-memory store of HTTP cache validators (ETag / Last-Modified) per feed URL,
+    together with the entries parsed from the last full response.
+
+    Used by fetch_feed to send conditional GET requests: when the publisher
+    answers 304 Not Modified, the stored entries are reused and the feed body
+    is neither downloaded nor re-parsed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = {}
+
+    @staticmethod
+    def _make_record(etag, last_modified, entries):
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "entries": [dict(entry) for entry in entries],
+            "stored_at": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }
+
+    def conditional_headers(self, feed_url):
+        """Return the If-None-Match / If-Modified-Since headers for a feed (may be empty)."""
+        with self._lock:
+            record = self._records.get(feed_url)
+        if not record:
+            return {}
+
+        headers = {}
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def get_validators(self, feed_url):
+        """Return (etag, last_modified) stored for a feed; both None if unknown."""
+        with self._lock:
+            record = self._records.get(feed_url)
+        if not record:
+            return None, None
+        return record.get("etag"), record.get("last_modified")
+
+    def get_entries(self, feed_url):
+        """Return a copy of the entries stored for a feed, or None if nothing is stored."""
+        with self._lock:
+            record = self._records.get(feed_url)
+        if not record:
+            return None
+        return [dict(entry) for entry in record["entries"]]
+
+    def update(self, feed_url, response_headers, entries):
+        """Remember the validators from a 200 response and the entries parsed from it."""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+
+        # Without validators there is nothing to send next time
+        if not etag and not last_modified:
+            self.discard(feed_url)
+            return
+
+        with self._lock:
+            self._records[feed_url] = self._make_record(etag, last_modified, entries)
+
+    def seed(self, feed_url, etag, last_modified, entries):
+        """Load validators from a persisted snapshot unless newer ones are already known."""
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            if feed_url not in self._records:
+                self._records[feed_url] = self._make_record(etag, last_modified, entries)
+
+    def discard(self, feed_url):
+        """Forget the validators for a feed, forcing a full download next time."""
+        with self._lock:
+            self._records.pop(feed_url, None)
+
+    def clear(self):
+        """Forget all stored validators."""
+        with self._lock:
+            self._records.clear()
+
+
+class FeedSnapshotCache:
+    """
+    On-disk cache of parsed feed entries, one JSON file per feed.
+
+    Each snapshot records when it was fetched and how long it stays fresh,
+    plus the HTTP validators of the response it came from, so a freshly
+    started process can serve the last good entries immediately and still
+    send conditional requests when it refreshes them.
+    Writes go to a temporary file that is atomically renamed into place,
+    so readers never see a half-written snapshot.
+    """
+
+    def __init__(self, cache_dir, default_ttl=3600):
+        self.cache_dir = cache_dir
+        self.default_ttl = default_ttl
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, feed_url):
+        digest = hashlib.sha1(feed_url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def load(self, feed_url):
+        """Return the stored snapshot for a feed, or None if missing or unreadable."""
+        path = self._path(feed_url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable feed snapshot {path}: {e}")
+            return None
+
+        if snapshot.get("feed_url") != feed_url or not isinstance(snapshot.get("entries"), list):
+            return None
+        return snapshot
+
+    def is_fresh(self, snapshot, now=None):
+        """True if the snapshot is still within its TTL."""
+        if not snapshot:
+            return False
+        now = time.time() if now is None else now
+        ttl = snapshot.get("ttl", self.default_ttl)
+        return now - snapshot.get("fetched_at", 0) < ttl
+
+    def save(self, feed_url, source_name, entries, etag=None, last_modified=None, ttl=None):
+        """Atomically write the snapshot for a feed."""
+        snapshot = {
+            "feed_url": feed_url,
+            "source": source_name,
+            "fetched_at": time.time(),
+            "ttl": self.default_ttl if ttl is None else ttl,
+            "etag": etag,
+            "last_modified": last_modified,
+            "entries": entries,
+        }
+
+        atomic_write_json(self._path(feed_url), snapshot)
+        return snapshot
@@ -0,0 +1,94 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Defaults for the concurrent feed collection
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_DEADLINE_SECONDS = 30
+
+
+def _timed_fetch(fetch_fn, url, source_name):
+    """Run a single feed fetch and measure how long it took."""
+    start = time.perf_counter()
+    try:
+        entries = fetch_fn(url, source_name)
+        return entries, None, time.perf_counter() - start
+    except Exception as e:
+        return None, str(e), time.perf_counter() - start
+
+
+def collect_feeds(feed_sources, fetch_fn, max_workers=DEFAULT_MAX_WORKERS, deadline=DEFAULT_DEADLINE_SECONDS):
+    """
+    Fetch all feeds concurrently with a cap on parallel requests and a total deadline.
+
+    Feeds that have not finished when the deadline expires are reported as
+    timed out and their entries are dropped, so a single stalled publisher
+    can no longer hold up the whole refresh.
+
+    Args:
+        feed_sources (dict): Mapping of feed URL -> source name
+        fetch_fn (callable): Function (url, source_name) -> list of entry dicts
+        max_workers (int): Maximum number of feeds fetched at the same time
+        deadline (float): Total time budget in seconds for the whole collection
+
+    Returns:
+        tuple: (all_entries, feed_report) where feed_report is a list of dicts
+               with keys: source, url, status, entries, seconds, error
+    """
+    all_entries = []
+    feed_report = []
+
+    if not feed_sources:
+        return all_entries, feed_report
+
+    entries_by_url = {}
+
+    collection_start = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(feed_sources))))
+    futures = {
+        executor.submit(_timed_fetch, fetch_fn, url, source_name): (url, source_name)
+        for url, source_name in feed_sources.items()
+    }
+
+    try:
+        done, not_done = wait(futures, timeout=deadline)
+    finally:
+        # Don't block on stragglers - they finish (or time out) in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for future in done:
+        url, source_name = futures[future]
+        entries, error, seconds = future.result()
+        if error:
+            status = "ERROR"
+        elif entries:
+            status = "OK"
+            entries_by_url[url] = entries
+        else:
+            status = "EMPTY"
+        feed_report.append({
+            "source": source_name,
+            "url": url,
+            "status": status,
+            "entries": len(entries) if entries else 0,
+            "seconds": round(seconds, 3),
+            "error": error,
+        })
+
+    for future in not_done:
+        url, source_name = futures[future]
+        feed_report.append({
+            "source": source_name,
+            "url": url,
+            "status": "TIMEOUT",
+            "entries": 0,
+            "seconds": round(time.perf_counter() - collection_start, 3),
+            "error": f"Deadline of {deadline} seconds exceeded",
+        })
+
+    # Keep the report (and the entry order) stable across runs
+    feed_order = {url: i for i, url in enumerate(feed_sources)}
+    feed_report.sort(key=lambda r: feed_order[r["url"]])
+    for url in feed_sources:
+        all_entries.extend(entries_by_url.get(url, []))
+
+    return all_entries, feed_report
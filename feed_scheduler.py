@@ -0,0 +1,177 @@
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from datetime import datetime
+
+from feed_cache import atomic_write_json
+
+# Poll limits in seconds
+MIN_POLL_INTERVAL = 15 * 60        # Never poll a feed more than every 15 minutes
+MAX_POLL_INTERVAL = 12 * 60 * 60   # Never wait more than 12 hours
+DEFAULT_POLL_INTERVAL = 60 * 60    # Until we have learned a feed's cadence
+
+# Poll roughly twice per expected publish interval so new items are picked up promptly
+POLL_FRACTION = 0.5
+
+# Exponential moving average weight for new observations
+EWMA_ALPHA = 0.3
+
+# Feeds slower than this (seconds) get polled up to 2x less often
+SLOW_FEED_LATENCY = 10.0
+
+# Error backoff: 5 min, 10 min, 20 min ... capped at 6 hours
+ERROR_BACKOFF_BASE = 5 * 60
+ERROR_BACKOFF_MAX = 6 * 60 * 60
+
+# Only the most recent entries describe the current publishing rhythm
+CADENCE_SAMPLE_SIZE = 20
+
+
+def estimate_publish_interval(entries):
+    """
+    Estimate how often a feed publishes from its entries' 'Date Created' values.
+
+    Args:
+        entries (list): Entry dicts with standardized 'Date Created' strings
+
+    Returns:
+        float or None: Median gap in seconds between consecutive entries,
+                       None if there are fewer than two usable timestamps
+    """
+    timestamps = []
+    for entry in entries:
+        try:
+            parsed = datetime.strptime(str(entry.get("Date Created")), '%Y-%m-%dT%H:%M:%SZ')
+            timestamps.append(parsed.timestamp())
+        except (TypeError, ValueError):
+            continue
+
+    timestamps = sorted(set(timestamps), reverse=True)[:CADENCE_SAMPLE_SIZE]
+    if len(timestamps) < 2:
+        return None
+
+    gaps = [newer - older for newer, older in zip(timestamps, timestamps[1:])]
+    return statistics.median(gaps)
+
+
+def _ewma(previous, observed):
+    if previous is None:
+        return observed
+    return EWMA_ALPHA * observed + (1 - EWMA_ALPHA) * previous
+
+
+class FeedScheduler:
+    """
+    Learns each feed's publish cadence, fetch latency and error history and
+    decides when the feed should be polled next.
+
+    Busy feeds (TechCrunch, The Verge) are polled close to the minimum
+    interval, quiet ones (ScienceDaily, HBR) stretch towards the maximum,
+    and failing feeds back off exponentially instead of being retried on
+    every refresh. State is persisted as JSON so it survives restarts.
+    """
+
+    def __init__(self, state_path=None):
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._feeds = {}
+        self._load()
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self._feeds = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable scheduler state {self.state_path}: {e}")
+            self._feeds = {}
+
+    def _save(self):
+        if not self.state_path:
+            return
+        try:
+            atomic_write_json(self.state_path, self._feeds)
+        except Exception as e:
+            print(f"⚠️ Could not save scheduler state: {e}")
+
+    def knows(self, feed_url):
+        """True if the scheduler has polled this feed before."""
+        with self._lock:
+            return feed_url in self._feeds
+
+    def feed_state(self, feed_url):
+        """Copy of the stored scheduling state for a feed ({} if never polled)."""
+        with self._lock:
+            return dict(self._feeds.get(feed_url, {}))
+
+    def is_due(self, feed_url, now=None):
+        """True if the feed should be polled now (unknown feeds are always due)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._feeds.get(feed_url)
+        if not state:
+            return True
+        return now >= state.get("next_poll", 0)
+
+    def _poll_interval(self, state):
+        publish_interval = state.get("publish_interval")
+        interval = publish_interval * POLL_FRACTION if publish_interval else DEFAULT_POLL_INTERVAL
+
+        # Slow feeds cost more per poll - stretch their interval up to 2x
+        latency = state.get("avg_latency") or 0.0
+        interval *= 1 + min(latency / SLOW_FEED_LATENCY, 1.0)
+
+        return max(MIN_POLL_INTERVAL, min(MAX_POLL_INTERVAL, interval))
+
+    def record_success(self, feed_url, entries, latency, now=None):
+        """Update cadence and latency estimates after a successful fetch and schedule the next poll."""
+        now = time.time() if now is None else now
+        observed_interval = estimate_publish_interval(entries)
+
+        with self._lock:
+            state = self._feeds.setdefault(feed_url, {})
+            if observed_interval:
+                state["publish_interval"] = _ewma(state.get("publish_interval"), observed_interval)
+            state["avg_latency"] = _ewma(state.get("avg_latency"), latency)
+            state["consecutive_errors"] = 0
+            state["last_poll"] = now
+            state["last_error"] = None
+            state["next_poll"] = now + self._poll_interval(state)
+            self._save()
+
+    def record_failure(self, feed_url, latency, error=None, now=None):
+        """Back off exponentially (with jitter) after a failed fetch."""
+        now = time.time() if now is None else now
+
+        with self._lock:
+            state = self._feeds.setdefault(feed_url, {})
+            state["consecutive_errors"] = state.get("consecutive_errors", 0) + 1
+            state["avg_latency"] = _ewma(state.get("avg_latency"), latency)
+            state["last_poll"] = now
+            state["last_error"] = str(error) if error else None
+
+            backoff = min(ERROR_BACKOFF_MAX, ERROR_BACKOFF_BASE * 2 ** (state["consecutive_errors"] - 1))
+            state["next_poll"] = now + backoff * random.uniform(0.8, 1.2)
+            self._save()
+
+    def report(self, feed_sources, now=None):
+        """Return a list of per-feed scheduling details for display."""
+        now = time.time() if now is None else now
+        rows = []
+        with self._lock:
+            for url, name in feed_sources.items():
+                state = self._feeds.get(url, {})
+                publish_interval = state.get("publish_interval")
+                next_poll = state.get("next_poll")
+                rows.append({
+                    "source": name,
+                    "publish_interval_min": round(publish_interval / 60, 1) if publish_interval else None,
+                    "avg_latency_s": round(state["avg_latency"], 2) if state.get("avg_latency") is not None else None,
+                    "consecutive_errors": state.get("consecutive_errors", 0),
+                    "next_poll_in_min": round(max(0, next_poll - now) / 60, 1) if next_poll else 0,
+                })
+        return rows
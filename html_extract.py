@@ -0,0 +1,471 @@
+import os
+import re
+from collections import defaultdict
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from token_utils import token_reduction
+
+# lxml is optional - fastest backend when installed, but not the default (see DEFAULT_BACKEND)
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Elements that never have content (not pushed on the tag stack)
+VOID_ELEMENTS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "meta", "param", "source", "track", "wbr",
+])
+
+# Text inside these is not part of get_text() output
+NON_TEXT_ELEMENTS = frozenset(["script", "style", "template"])
+
+# Whitespace-only text inside these is kept verbatim
+PRESERVE_WHITESPACE_ELEMENTS = frozenset(["pre", "textarea"])
+
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+class ParagraphTokenizer(HTMLParser):
+    """
+    Streaming <p>-only extractor built on the stdlib tokenizer.
+
+    Mirrors BeautifulSoup's html.parser tree semantics without building a tree:
+    nested paragraphs stay nested, an end tag closes everything opened after
+    its matching start tag, whitespace-only runs collapse the way bs4 collapses
+    them, and script/style/comment text is ignored. Can be fed incrementally,
+    so it also works on a partially downloaded page.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []     # Text fragments per <p>, in document order
+        self._stack = []         # (tag, paragraph index or None)
+        self._open_paragraphs = []
+        self._skip_depth = 0
+        self._preserve_depth = 0
+        self._pending = []       # Text since the last markup event
+
+    def _flush(self):
+        """Attach buffered text to the open paragraphs (bs4 does this at every tag and comment)."""
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending = []
+        if self._skip_depth or not self._open_paragraphs:
+            return
+        if not self._preserve_depth and not data.strip(ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        self._add_text(data)
+
+    def _add_text(self, data):
+        for index in self._open_paragraphs:
+            self.paragraphs[index].append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in VOID_ELEMENTS:
+            return
+        index = None
+        if tag == "p":
+            index = len(self.paragraphs)
+            self.paragraphs.append([])
+            self._open_paragraphs.append(index)
+        elif tag in NON_TEXT_ELEMENTS:
+            self._skip_depth += 1
+        elif tag in PRESERVE_WHITESPACE_ELEMENTS:
+            self._preserve_depth += 1
+        self._stack.append((tag, index))
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+        # <p/> is an empty paragraph
+        if tag == "p":
+            self.paragraphs.append([])
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, index = self._stack.pop()
+            if index is not None:
+                self._open_paragraphs.remove(index)
+            elif open_tag in NON_TEXT_ELEMENTS:
+                self._skip_depth -= 1
+            elif open_tag in PRESERVE_WHITESPACE_ELEMENTS:
+                self._preserve_depth -= 1
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        self._pending.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        # bs4 keeps CDATA sections as text
+        if data.upper().startswith("CDATA["):
+            self._pending.append(data[len("CDATA["):])
+            self._flush()
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def paragraph_texts(self):
+        self._flush()
+        return ["".join(fragments) for fragments in self.paragraphs]
+
+
+def extract_with_stream(html):
+    tokenizer = ParagraphTokenizer()
+    tokenizer.feed(html)
+    tokenizer.close()
+    return "\n".join(tokenizer.paragraph_texts())
+
+
+def extract_with_soup(html):
+    # Only build tree nodes for <p> elements and their contents
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("p"))
+    return "\n".join(p.get_text() for p in soup.find_all("p"))
+
+
+def _collapse_whitespace(text, preserve):
+    """bs4 turns a whitespace-only string into a single newline or space (except inside <pre>/<textarea>)."""
+    if not preserve and not text.strip(ASCII_SPACES):
+        return "\n" if "\n" in text else " "
+    return text
+
+
+def _lxml_text_parts(element, preserve=False, in_link=False):
+    """
+    Yield (text, inside a link?) for every string under an lxml element, the
+    way bs4's get_text() sees them: script/style/template skipped and
+    whitespace-only strings collapsed.
+    """
+    tag = element.tag if isinstance(element.tag, str) else None  # Comments and PIs have no string tag
+    if tag is None or tag in NON_TEXT_ELEMENTS:
+        return
+    preserve = preserve or tag in PRESERVE_WHITESPACE_ELEMENTS
+    in_link = in_link or tag == "a"
+    if element.text:
+        yield _collapse_whitespace(element.text, preserve), in_link
+    for child in element:
+        yield from _lxml_text_parts(child, preserve, in_link)
+        if child.tail:
+            yield _collapse_whitespace(child.tail, preserve), in_link
+
+
+def _parse_lxml(html):
+    """lxml document for html, or None when lxml cannot parse it."""
+    if not LXML_AVAILABLE or not html or not html.strip():
+        return None
+    try:
+        return lxml.html.document_fromstring(html)
+    except Exception:
+        # Empty or non-HTML documents (or str input with an XML encoding declaration)
+        return None
+
+
+def extract_with_lxml(html):
+    if not html or not html.strip():
+        return ""
+    document = _parse_lxml(html)
+    if document is None:
+        # Fall back to the tolerant tokenizer
+        return extract_with_stream(html)
+    return "\n".join("".join(text for text, _ in _lxml_text_parts(p)) for p in document.iter("p"))
+
+
+def extract_with_full_soup(html):
+    """Reference implementation - the original full-tree BeautifulSoup extraction."""
+    soup = BeautifulSoup(html, "html.parser")
+    return "\n".join(p.get_text() for p in soup.find_all("p"))
+
+
+BACKENDS = {
+    "stream": extract_with_stream,
+    "soup": extract_with_soup,
+    "full_soup": extract_with_full_soup,
+}
+if LXML_AVAILABLE:
+    BACKENDS["lxml"] = extract_with_lxml
+
+# Only stream reproduces full_soup exactly. lxml (libxml2 closes a <p> at the
+# first block element and drops CDATA and anything after </html>) and soup (the
+# strainer never sees the non-<p> end tags that close a paragraph) are faster
+# but differ on real-world markup - opt in with HTML_EXTRACT_BACKEND
+DEFAULT_BACKEND = os.getenv("HTML_EXTRACT_BACKEND", "stream")
+
+
+def extract_paragraph_text(html, backend=None):
+    """
+    Join the text of every <p> element in an HTML document.
+
+    Args:
+        html (str): Page HTML
+        backend (str): One of BACKENDS ("lxml", "stream", "soup", "full_soup");
+                       defaults to DEFAULT_BACKEND
+
+    Returns:
+        str: Paragraph texts joined with newlines
+    """
+    name = backend or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML extraction backend '{name}'. Available: {', '.join(sorted(BACKENDS))}")
+    return BACKENDS[name](html)
+
+
+# --- Main-content extraction (readability-style block scoring) ---
+
+# Paragraphs inside these are page chrome, never article body
+BOILERPLATE_ELEMENTS = frozenset(["aside", "figcaption", "figure", "footer", "form", "header", "nav"])
+
+# class/id hints, in the spirit of Mozilla Readability
+UNLIKELY_HINTS = re.compile(
+    r"banner|breadcrumb|combx|comment|consent|cookie|disqus|footer|gdpr|masthead|modal|"
+    r"newsletter|outbrain|paywall|popup|promo|related|recommend|share|sharing|shopping|"
+    r"sidebar|signup|social|sponsor|subscribe|taboola|widget|(?:^|[\s_-])ads?(?:[\s_-]|$)|advert",
+    re.I
+)
+POSITIVE_HINTS = re.compile(r"article|body|content|entry|hentry|main|post|story|text", re.I)
+NEGATIVE_HINTS = re.compile(r"byline|caption|comment|footer|meta|nav|promo|related|share|sidebar|tags", re.I)
+
+# Elements that can never be dropped as "unlikely", whatever their class says
+NEVER_UNLIKELY = frozenset(["html", "body", "main", "article"])
+
+TAG_WEIGHTS = {"article": 10, "main": 10, "div": 5, "section": 3, "blockquote": 3, "td": 3,
+               "ul": -3, "ol": -3, "li": -3, "form": -3, "table": -3}
+
+# Tuning knobs for extract_main_content
+MAIN_CONTENT_MIN_PARAGRAPH_CHARS = 25     # Shorter paragraphs don't vote for their container
+MAIN_CONTENT_MAX_LINK_DENSITY = 0.5       # Paragraphs that are mostly links are dropped
+MAIN_CONTENT_MIN_CHARS = int(os.getenv("MAIN_CONTENT_MIN_CHARS", "250"))
+
+
+class MainContentTokenizer(ParagraphTokenizer):
+    """
+    ParagraphTokenizer that also remembers, for every <p>, which elements
+    enclose it (with their class/id hints) and how much of its text is link
+    text - everything needed to score blocks without building a DOM.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.nodes = []              # (tag, parent node, class/id weight)
+        self.paragraph_info = []     # (ancestor node ids, unlikely) per paragraph
+        self.link_chars = []         # Link-text characters per paragraph
+        self._node_stack = []        # Node ids parallel to self._stack
+        self._link_depth = 0
+        self._unlikely_depth = 0
+        self._unlikely_nodes = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "p":
+            self._flush()
+            self.paragraph_info.append((tuple(self._node_stack), self._unlikely_depth > 0))
+            self.link_chars.append(0)
+        super().handle_starttag(tag, attrs)
+        if len(self._stack) == len(self._node_stack):
+            return  # Void element
+
+        hint = " ".join(value for name, value in attrs if name in ("class", "id") and value)
+        weight, unlikely = _block_hints(tag, hint)
+        node_id = len(self.nodes)
+        self.nodes.append((tag, self._node_stack[-1] if self._node_stack else None, weight))
+        self._node_stack.append(node_id)
+
+        if tag == "a":
+            self._link_depth += 1
+        if unlikely:
+            self._unlikely_depth += 1
+            self._unlikely_nodes.add(node_id)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == "p":
+            self._flush()
+            self.paragraph_info.append((tuple(self._node_stack), self._unlikely_depth > 0))
+            self.link_chars.append(0)
+        super().handle_startendtag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        super().handle_endtag(tag)
+        for node_id in self._node_stack[len(self._stack):]:
+            if self.nodes[node_id][0] == "a":
+                self._link_depth -= 1
+            if node_id in self._unlikely_nodes:
+                self._unlikely_depth -= 1
+        del self._node_stack[len(self._stack):]
+
+    def _add_text(self, data):
+        super()._add_text(data)
+        if self._link_depth:
+            for index in self._open_paragraphs:
+                self.link_chars[index] += len(data)
+
+
+def _block_hints(tag, hint):
+    """(class/id weight, unlikely?) for an element."""
+    weight = 0
+    if hint:
+        if POSITIVE_HINTS.search(hint):
+            weight += 25
+        if NEGATIVE_HINTS.search(hint):
+            weight -= 25
+    unlikely = tag not in NEVER_UNLIKELY and (
+        tag in BOILERPLATE_ELEMENTS or bool(hint and UNLIKELY_HINTS.search(hint) and not POSITIVE_HINTS.search(hint)))
+    return weight, unlikely
+
+
+class LxmlMainContent:
+    """
+    The same block data MainContentTokenizer collects (nodes, paragraph_info,
+    link_chars, paragraph_texts()), read from an lxml tree - the C parser does
+    the tokenizing, so this is several times faster than the stdlib tokenizer.
+    """
+
+    def __init__(self, document):
+        self.nodes = []
+        self.paragraph_info = []
+        self.link_chars = []
+        self._texts = []
+        self._visit(document, (), False, False)
+
+    def _visit(self, element, ancestors, unlikely, in_link):
+        tag = element.tag if isinstance(element.tag, str) else None
+        if tag is None or tag in VOID_ELEMENTS:
+            return
+        if tag == "p":
+            parts = list(_lxml_text_parts(element, in_link=in_link))
+            self.paragraph_info.append((ancestors, unlikely))
+            self.link_chars.append(sum(len(text) for text, linked in parts if linked))
+            self._texts.append("".join(text for text, _ in parts))
+        if tag in NON_TEXT_ELEMENTS:
+            return
+
+        hint = " ".join(value for value in (element.get("class"), element.get("id")) if value)
+        weight, element_unlikely = _block_hints(tag, hint)
+        node_id = len(self.nodes)
+        self.nodes.append((tag, ancestors[-1] if ancestors else None, weight))
+        ancestors = ancestors + (node_id,)
+        unlikely = unlikely or element_unlikely
+        in_link = in_link or tag == "a"
+        for child in element:
+            self._visit(child, ancestors, unlikely, in_link)
+
+    def paragraph_texts(self):
+        return list(self._texts)
+
+
+def _select_main_paragraphs(tokenizer):
+    """
+    Score enclosing blocks by text and link density; return the indexes of body paragraphs.
+    tokenizer is a MainContentTokenizer or an LxmlMainContent.
+    """
+    texts = tokenizer.paragraph_texts()
+    scores = defaultdict(float)
+    text_chars = defaultdict(int)
+    link_chars = defaultdict(int)
+
+    for index, text in enumerate(texts):
+        ancestors, unlikely = tokenizer.paragraph_info[index]
+        if unlikely:
+            continue
+        for node_id in ancestors:
+            text_chars[node_id] += len(text)
+            link_chars[node_id] += tokenizer.link_chars[index]
+
+        stripped = text.strip()
+        if len(stripped) < MAIN_CONTENT_MIN_PARAGRAPH_CHARS:
+            continue
+        # Parent gets the full score, grandparent half, great-grandparent a sixth
+        score = 1 + stripped.count(",") + min(len(stripped) // 100, 3)
+        for level, node_id in enumerate(reversed(ancestors[-3:])):
+            if node_id not in scores:
+                tag, _, weight = tokenizer.nodes[node_id]
+                scores[node_id] = weight + TAG_WEIGHTS.get(tag, 0)
+            scores[node_id] += score / (1, 2, 6)[level]
+
+    if not scores:
+        return []
+
+    final = {
+        node_id: score * (1 - link_chars[node_id] / text_chars[node_id]) if text_chars[node_id] else score
+        for node_id, score in scores.items()
+    }
+    top = max(final, key=final.get)
+    # Articles split across sibling blocks (e.g. one <div> per section) keep every strong sibling
+    parent = tokenizer.nodes[top][1]
+    threshold = max(10.0, final[top] * 0.2)
+    selected = {top} | {
+        node_id for node_id, score in final.items()
+        if node_id != top and parent is not None and tokenizer.nodes[node_id][1] == parent and score >= threshold
+    }
+
+    keep = []
+    for index, text in enumerate(texts):
+        ancestors, unlikely = tokenizer.paragraph_info[index]
+        if unlikely or not text.strip() or not selected.intersection(ancestors):
+            continue
+        if tokenizer.link_chars[index] > len(text) * MAIN_CONTENT_MAX_LINK_DENSITY:
+            continue
+        keep.append(index)
+    return keep
+
+
+def _main_content_blocks(html, backend=None):
+    """Block data for scoring - from lxml when that is the extraction backend, else the stdlib tokenizer."""
+    if (backend or DEFAULT_BACKEND) == "lxml":
+        document = _parse_lxml(html)
+        if document is not None:
+            return LxmlMainContent(document)
+    tokenizer = MainContentTokenizer()
+    tokenizer.feed(html or "")
+    tokenizer.close()
+    return tokenizer
+
+
+def extract_article(html, min_chars=MAIN_CONTENT_MIN_CHARS, backend=None):
+    """
+    Extract only the article body: paragraphs from the highest-scoring content
+    block (and its strong siblings), minus cookie banners, newsletter boxes,
+    "related stories", footers and link lists.
+
+    Falls back to every <p> on the page when the selected body is shorter than
+    min_chars, so an unusual layout never loses the article. Blocks are read
+    with the streaming tokenizer, or with lxml when HTML_EXTRACT_BACKEND=lxml
+    (faster, but see DEFAULT_BACKEND for where its tree differs).
+
+    Returns:
+        tuple: (text, report) - report holds the token estimate of the full
+               <p> text vs. the main-content text (see token_utils.token_reduction)
+               plus 'main_content' (False when the fallback was used)
+    """
+    tokenizer = _main_content_blocks(html, backend)
+
+    texts = tokenizer.paragraph_texts()
+    full_text = "\n".join(texts)
+    main_text = "\n".join(texts[index] for index in _select_main_paragraphs(tokenizer))
+
+    used_main = len(main_text.strip()) >= min_chars
+    text = main_text if used_main else full_text
+    report = token_reduction(full_text, text)
+    report['main_content'] = used_main
+    return text, report
+
+
+def extract_main_content(html, min_chars=MAIN_CONTENT_MIN_CHARS, backend=None):
+    """Article body text only (see extract_article)."""
+    return extract_article(html, min_chars=min_chars, backend=backend)[0]
@@ -0,0 +1,83 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# brotli is optional - only advertise "br" when urllib3 can actually decode it
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+# Connection pool settings
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "32"))  # Number of hosts kept warm
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))          # Connections per host
+
+# Retry policy for transient failures
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(max_retries=HTTP_MAX_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR,
+                  pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE):
+    """
+    Build a requests.Session with per-host connection pooling, keep-alive,
+    compressed transfer encoding and a retry policy for transient errors.
+
+    Args:
+        max_retries (int): Retries for connection errors and 429/5xx responses
+        backoff_factor (float): Exponential backoff factor between retries
+        pool_connections (int): Number of per-host connection pools to keep
+        pool_maxsize (int): Maximum open connections per host
+
+    Returns:
+        requests.Session: Configured session
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=HTTP_RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+def get_session():
+    """Return the process-wide shared session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def http_get(url, headers=None, timeout=10, **kwargs):
+    """GET a URL through the shared pooled session (same signature as requests.get)."""
+    return get_session().get(url, headers=headers, timeout=timeout, **kwargs)
@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class KnownUrlIndex:
+    """
+    Local persistent index of article URLs already stored in DynamoDB.
+
+    URLs live in a small SQLite file and are mirrored in an in-memory set,
+    so deciding whether a feed entry is new is a set lookup. Only URLs the
+    index has never seen need to be checked against DynamoDB.
+
+    The index is filled once from a keys-only table scan and then kept up to
+    date incrementally: every successful save and every URL found to exist
+    remotely is added. A periodic full re-sync drops URLs that have since
+    expired or been deleted from the table.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS known_urls (url TEXT PRIMARY KEY, added_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._urls = {row[0] for row in conn.execute("SELECT url FROM known_urls")}
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per operation keeps us safe across Streamlit threads
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:  # Commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._urls)
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self._urls
+
+    def last_full_sync(self):
+        """Epoch seconds of the last full sync from DynamoDB, or None if never synced."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM index_meta WHERE key = 'last_full_sync'").fetchone()
+        return float(row[0]) if row else None
+
+    def needs_full_sync(self, max_age_seconds):
+        """True if the index was never synced or the last full sync is older than max_age_seconds."""
+        last_sync = self.last_full_sync()
+        return last_sync is None or time.time() - last_sync > max_age_seconds
+
+    def add_many(self, urls):
+        """Record URLs as known (persisted immediately)."""
+        with self._lock:
+            new_urls = [url for url in dict.fromkeys(urls) if url and url not in self._urls]
+            if not new_urls:
+                return 0
+            now = time.time()
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO known_urls (url, added_at) VALUES (?, ?)",
+                    [(url, now) for url in new_urls]
+                )
+            self._urls.update(new_urls)
+        return len(new_urls)
+
+    def filter_unknown(self, urls):
+        """Return the URLs (in input order) that are not in the index."""
+        with self._lock:
+            return [url for url in urls if url not in self._urls]
+
+    def sync_from_table(self, table):
+        """
+        Replace the index with the full set of keys from a keys-only table scan.
+
+        Returns:
+            int: Number of URLs in the index after the sync
+        """
+        urls = set()
+        scan_kwargs = {
+            'ProjectionExpression': '#u',
+            'ExpressionAttributeNames': {'#u': 'url'},
+        }
+        while True:
+            response = table.scan(**scan_kwargs)
+            urls.update(item['url'] for item in response.get('Items', []) if item.get('url'))
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                break
+            scan_kwargs['ExclusiveStartKey'] = last_evaluated_key
+
+        now = time.time()
+        with self._lock:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM known_urls")
+                conn.executemany(
+                    "INSERT INTO known_urls (url, added_at) VALUES (?, ?)",
+                    [(url, now) for url in urls]
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO index_meta (key, value) VALUES ('last_full_sync', ?)",
+                    (str(now),)
+                )
+            self._urls = urls
+        return len(urls)
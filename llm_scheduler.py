@@ -0,0 +1,356 @@
+import heapq
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from token_utils import estimate_tokens
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0   # Content generation a user is waiting for
+PRIORITY_BACKGROUND = 10   # Article ranking
+
+# Requests and tokens per minute per model. Override with LLM_RATE_LIMITS, e.g.
+# '{"gpt-4o-mini": {"rpm": 500, "tpm": 200000}}'; unknown models use "default"
+DEFAULT_RATE_LIMITS = {
+    "gpt-4o-mini": {"rpm": 500, "tpm": 200000},
+    "gpt-4o": {"rpm": 500, "tpm": 30000},
+    "o4-mini": {"rpm": 500, "tpm": 200000},
+    "default": {"rpm": 500, "tpm": 30000},
+}
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+
+DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+
+
+def _load_rate_limits():
+    limits = {model: dict(values) for model, values in DEFAULT_RATE_LIMITS.items()}
+    raw = os.getenv("LLM_RATE_LIMITS")
+    if raw:
+        try:
+            for model, values in json.loads(raw).items():
+                limits.setdefault(model, {}).update(values)
+        except (ValueError, AttributeError) as e:
+            print(f"⚠️ Ignoring invalid LLM_RATE_LIMITS: {e}")
+    return limits
+
+
+def parse_reset_duration(value):
+    """Seconds from OpenAI reset headers such as '1s', '6m0s', '20ms' or '0.5'."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART_RE.findall(value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def _response_headers(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    return headers or {}
+
+
+def is_rate_limit_error(error):
+    """True for HTTP 429 errors from the OpenAI SDK (directly or via LangChain)."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+# Failures worth another attempt besides 429s - what the OpenAI SDK itself retries
+TRANSIENT_ERROR_NAMES = frozenset({"APIConnectionError", "APITimeoutError", "InternalServerError"})
+
+
+def is_transient_error(error):
+    """True for timeouts, connection failures and 5xx responses - errors a retry may not hit again."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def retry_delay(error, attempt):
+    """
+    How long to wait before retrying a rate-limited or failed call: the server's
+    retry-after / x-ratelimit-reset-* hint when present, otherwise
+    exponential backoff. Full jitter spreads out the callers that were all
+    throttled at once.
+    """
+    headers = _response_headers(error)
+    retry_after_ms = parse_reset_duration(headers.get("retry-after-ms"))
+    hints = [
+        retry_after_ms / 1000 if retry_after_ms else None,
+        parse_reset_duration(headers.get("retry-after")),
+        parse_reset_duration(headers.get("x-ratelimit-reset-requests")),
+        parse_reset_duration(headers.get("x-ratelimit-reset-tokens")),
+    ]
+    hints = [hint for hint in hints if hint]
+    backoff = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt)
+    base = min(LLM_BACKOFF_MAX, max(hints)) if hints else backoff
+    return base + random.uniform(0, base * 0.5 if hints else backoff)
+
+
+class TokenBucket:
+    """Classic token bucket: capacity units, refilled continuously at rate units per second."""
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.level = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount can be taken (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # An oversized request waits for a full bucket, not forever
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def drain(self, now):
+        """Empty the bucket - the server told us we are over the limit."""
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+
+class _ModelState:
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm, rpm / 60.0)
+        self.tokens = TokenBucket(tpm, tpm / 60.0)
+        self.paused_until = 0.0
+        self.waiting = []          # Heap of (priority, sequence)
+        self.in_flight = 0
+        self.completed = 0
+        self.rate_limited = 0
+        self.transient_errors = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.max_queue_depth = 0
+
+
+class LLMScheduler:
+    """
+    Process-wide admission control for LLM calls, shared by every Streamlit
+    session and worker thread.
+
+    Each model has a request bucket and a token bucket sized from its
+    per-minute limits. Callers queue by priority (interactive content
+    generation ahead of background ranking, FIFO within a priority) and are
+    admitted when they are at the head of their model's queue and both
+    buckets can cover the call. A 429 pauses the whole model for the
+    server-advertised reset time plus jitter, then the call is retried.
+    Timeouts, connection errors and 5xx responses are retried with the same
+    jittered backoff, without pausing other callers.
+    """
+
+    def __init__(self, rate_limits=None, max_retries=LLM_MAX_RETRIES):
+        self.rate_limits = rate_limits or _load_rate_limits()
+        self.max_retries = max_retries
+        self._condition = threading.Condition()
+        self._models = {}
+        self._sequence = itertools.count()
+
+    def _state(self, model):
+        if model not in self._models:
+            limits = self.rate_limits.get(model) or self.rate_limits["default"]
+            self._models[model] = _ModelState(limits["rpm"], limits["tpm"])
+        return self._models[model]
+
+    def _acquire(self, model, tokens, priority):
+        with self._condition:
+            state = self._state(model)
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(state.waiting, ticket)
+            state.max_queue_depth = max(state.max_queue_depth, len(state.waiting))
+            queued_at = time.monotonic()
+            try:
+                while True:
+                    now = time.monotonic()
+                    if state.waiting[0] == ticket:
+                        wait = max(
+                            state.paused_until - now,
+                            state.requests.wait_time(1, now),
+                            state.tokens.wait_time(tokens, now),
+                        )
+                        if wait <= 0:
+                            state.requests.take(1, now)
+                            state.tokens.take(tokens, now)
+                            state.in_flight += 1
+                            waited = now - queued_at
+                            state.wait_seconds += waited
+                            state.max_wait_seconds = max(state.max_wait_seconds, waited)
+                            return
+                        self._condition.wait(timeout=wait)
+                    else:
+                        self._condition.wait(timeout=1.0)
+            finally:
+                state.waiting.remove(ticket)
+                heapq.heapify(state.waiting)
+                self._condition.notify_all()
+
+    def _release(self, model, rate_limited_error=None, attempt=0):
+        with self._condition:
+            state = self._state(model)
+            state.in_flight -= 1
+            delay = 0.0
+            if rate_limited_error is not None:
+                now = time.monotonic()
+                delay = retry_delay(rate_limited_error, attempt)
+                state.rate_limited += 1
+                state.paused_until = max(state.paused_until, now + delay)
+                state.requests.drain(now)
+            self._condition.notify_all()
+            return delay
+
+    def run(self, model, call, tokens=0, priority=PRIORITY_BACKGROUND):
+        """
+        Run call() once the model's rate limits allow it, retrying on 429s and
+        transient failures (timeouts, connection errors, 5xx).
+
+        Args:
+            model (str): Model name (selects the buckets)
+            call (callable): Zero-argument function that performs the request
+            tokens (int): Estimated prompt + completion tokens for the token bucket
+            priority (int): PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+
+        Returns:
+            Whatever call() returns
+
+        Raises:
+            The last error once retries are exhausted, or any other error immediately
+        """
+        attempt = 0
+        while True:
+            self._acquire(model, tokens, priority)
+            try:
+                result = call()
+            except Exception as e:
+                rate_limited = is_rate_limit_error(e)
+                if not (rate_limited or is_transient_error(e)) or attempt >= self.max_retries:
+                    self._release(model)
+                    with self._condition:
+                        self._state(model).failures += 1
+                    raise
+                if rate_limited:
+                    self._release(model, rate_limited_error=e, attempt=attempt)
+                else:
+                    self._release(model)
+                    with self._condition:
+                        self._state(model).transient_errors += 1
+                    time.sleep(retry_delay(e, attempt))  # Only this caller backs off
+                attempt += 1
+                with self._condition:
+                    self._state(model).retries += 1
+                continue
+            self._release(model)
+            with self._condition:
+                self._state(model).completed += 1
+            return result
+
+    def metrics(self):
+        """Per-model queue depth, in-flight calls, waits, 429 and transient error counts."""
+        with self._condition:
+            now = time.monotonic()
+            report = []
+            for model, state in sorted(self._models.items()):
+                admitted = state.completed + state.failures + state.retries
+                report.append({
+                    'model': model,
+                    'queued': len(state.waiting),
+                    'queued_interactive': sum(1 for priority, _ in state.waiting if priority <= PRIORITY_INTERACTIVE),
+                    'in_flight': state.in_flight,
+                    'max_queue_depth': state.max_queue_depth,
+                    'completed': state.completed,
+                    'rate_limited': state.rate_limited,
+                    'transient_errors': state.transient_errors,
+                    'retries': state.retries,
+                    'failures': state.failures,
+                    'avg_wait_s': round(state.wait_seconds / admitted, 3) if admitted else 0.0,
+                    'max_wait_s': round(state.max_wait_seconds, 3),
+                    'paused_for_s': round(max(0.0, state.paused_until - now), 1),
+                })
+            return report
+
+    def queue_depth(self, model=None):
+        """Calls waiting or in flight (for one model, or all) - a load signal for callers."""
+        with self._condition:
+            states = [self._models[model]] if model in self._models else ([] if model else self._models.values())
+            return sum(len(state.waiting) + state.in_flight for state in states)
+
+
+def estimate_message_tokens(messages):
+    """Token estimate for a chat request given as LangChain messages or OpenAI dicts."""
+    total = 0
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", "")
+        total += estimate_tokens(content if isinstance(content, str) else str(content)) + 4
+    return total
+
+
+class ScheduledChatModel:
+    """
+    Drop-in wrapper for a LangChain chat model whose invoke/batch calls go
+    through the shared scheduler. Build the wrapped model with max_retries=0
+    so 429s reach the scheduler instead of being retried blindly.
+    """
+
+    def __init__(self, llm, scheduler, priority=PRIORITY_BACKGROUND, completion_tokens=200):
+        self.llm = llm
+        self.scheduler = scheduler
+        self.priority = priority
+        self.completion_tokens = completion_tokens
+        self.model_name = getattr(llm, "model_name", None) or getattr(llm, "model", "default")
+
+    def invoke(self, messages, **kwargs):
+        tokens = estimate_message_tokens(messages) + self.completion_tokens
+        return self.scheduler.run(self.model_name, lambda: self.llm.invoke(messages, **kwargs),
+                                  tokens=tokens, priority=self.priority)
+
+    def batch(self, inputs, return_exceptions=False, max_concurrency=None):
+        """Like Runnable.batch: each input is scheduled individually, results keep input order."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def _one(messages):
+            try:
+                return self.invoke(messages)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        if not inputs:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency or len(inputs), len(inputs)))) as executor:
+            return list(executor.map(_one, inputs))
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler():
+    """The process-wide scheduler (module state survives Streamlit reruns and is shared by sessions)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
@@ -0,0 +1,134 @@
+import math
+import os
+
+from prompts import RANKING_TOPICS
+
+# Ranking models from cheapest/fastest to strongest
+RANKING_MODEL_TIERS = [
+    ("small", os.getenv("RANKING_MODEL_SMALL", "gpt-4.1-nano")),
+    ("standard", os.getenv("RANKING_MODEL_STANDARD", "gpt-4o-mini")),
+    ("strong", os.getenv("RANKING_MODEL_STRONG", "gpt-4o")),
+]
+TIER_NAMES = [tier for tier, _ in RANKING_MODEL_TIERS]
+
+# Off by default: every article goes to the standard model, as before
+RANKING_ROUTING = os.getenv("RANKING_ROUTING", "false").lower() in ("1", "true", "yes")
+# Short articles the pre-ranker is sure about go to the small model
+ROUTE_SMALL_MAX_TOKENS = int(os.getenv("ROUTE_SMALL_MAX_TOKENS", "1200"))
+ROUTE_CONFIDENCE = float(os.getenv("ROUTE_CONFIDENCE", "0.7"))
+# With this many ranking calls waiting or in flight, anything within the prompt budget goes to the small model
+ROUTE_BUSY_QUEUE_DEPTH = int(os.getenv("ROUTE_BUSY_QUEUE_DEPTH", "16"))
+
+# Pre-scores this far out make a contradicting LLM score suspicious
+CONTRADICTION_HIGH_PRESCORE = 0.9
+CONTRADICTION_LOW_PRESCORE = 0.02
+CONTRADICTION_HIGH_SCORE = 11
+CONTRADICTION_LOW_SCORE = 3
+
+
+def prescore_confidence(prerank_score):
+    """How sure the pre-ranker is either way: 0 at a coin flip, 1 at 0% or 100%. None without a score."""
+    if prerank_score is None:
+        return None
+    return abs(2 * float(prerank_score) - 1)
+
+
+def routing_fingerprint():
+    """Everything that decides which model scores an article - part of the ranking cache version."""
+    models = ",".join(f"{tier}={model}" for tier, model in RANKING_MODEL_TIERS)
+    return (f"routing={RANKING_ROUTING};{models};small_tokens={ROUTE_SMALL_MAX_TOKENS};"
+            f"confidence={ROUTE_CONFIDENCE};busy={ROUTE_BUSY_QUEUE_DEPTH}")
+
+
+def choose_tier(tokens, prerank_score=None, queue_depth=0, max_tokens=None):
+    """
+    Pick the model tier for one ranking request.
+
+    Args:
+        tokens (int): Article tokens that will be sent
+        prerank_score (float): Relevance probability from a trained pre-ranker, or None
+        queue_depth (int): Ranking calls currently waiting or in flight
+        max_tokens (int): Prompt budget - longer input is never sent to the small model
+
+    Returns:
+        tuple: (tier name, reason)
+    """
+    if not RANKING_ROUTING:
+        return "standard", "routing off"
+    confidence = prescore_confidence(prerank_score)
+    if tokens <= ROUTE_SMALL_MAX_TOKENS and confidence is not None and confidence >= ROUTE_CONFIDENCE:
+        return "small", f"short ({tokens} tokens), pre-score confidence {confidence:.2f}"
+    if queue_depth >= ROUTE_BUSY_QUEUE_DEPTH and (max_tokens is None or tokens <= max_tokens):
+        return "small", f"queue depth {queue_depth}"
+    return "standard", "default"
+
+
+def next_tier(tier):
+    """The next stronger tier, or None at the top."""
+    index = TIER_NAMES.index(tier)
+    return TIER_NAMES[index + 1] if index + 1 < len(TIER_NAMES) else None
+
+
+def ranking_problem(ranking, prerank_score=None):
+    """
+    Why a model's ranking should not be trusted, or None if it looks sound.
+
+    A ranking is inconsistent when a topic is missing or out of the 0-15
+    range, or when it flatly contradicts a confident pre-score (an article the
+    pre-ranker is sure about scored at the opposite end of the rubric).
+    """
+    scores = []
+    for topic in RANKING_TOPICS:
+        try:
+            score = int(ranking[topic])
+        except (KeyError, TypeError, ValueError):
+            return f"missing or non-numeric score for '{topic}'"
+        if not 0 <= score <= 15:
+            return f"score {score} for '{topic}' is outside 0-15"
+        scores.append(score)
+
+    if prerank_score is not None:
+        if prerank_score >= CONTRADICTION_HIGH_PRESCORE and max(scores) < CONTRADICTION_LOW_SCORE:
+            return f"all scores below {CONTRADICTION_LOW_SCORE} despite pre-score {prerank_score:.2f}"
+        if prerank_score <= CONTRADICTION_LOW_PRESCORE and max(scores) >= CONTRADICTION_HIGH_SCORE:
+            return f"score {max(scores)} despite pre-score {prerank_score:.2f}"
+    return None
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def latency_report(rows):
+    """
+    p50/p95 ranking latency per route.
+
+    Args:
+        rows (list): Dicts with 'route' and 'latency_s' (rows without a latency are ignored)
+
+    Returns:
+        list: One dict per route plus an "all" row, slowest p95 first
+    """
+    by_route = {}
+    for row in rows:
+        if row.get('latency_s') is not None:
+            by_route.setdefault(row.get('route') or "unknown", []).append(row['latency_s'])
+    if not by_route:
+        return []
+
+    def _summary(route, latencies):
+        return {
+            'route': route,
+            'articles': len(latencies),
+            'p50_s': round(percentile(latencies, 50), 2),
+            'p95_s': round(percentile(latencies, 95), 2),
+            'max_s': round(max(latencies), 2),
+        }
+
+    report = sorted((_summary(route, latencies) for route, latencies in by_route.items()), key=lambda r: -r['p95_s'])
+    report.append(_summary("all", [latency for latencies in by_route.values() for latency in latencies]))
+    return report
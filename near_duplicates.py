@@ -0,0 +1,175 @@
+import hashlib
+import os
+
+import numpy as np
+
+from ranking_cache import normalize_content
+
+# 64 permutations in 16 bands of 4 rows: pairs above ~0.6 Jaccard similarity
+# almost always share a band, pairs below ~0.3 rarely do
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+# Character 5-grams tolerate the rewording outlets apply to the same announcement
+SHINGLE_CHARS = 5
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.6"))
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+LOW_32 = np.uint64((1 << 32) - 1)
+LOW_29 = np.uint64((1 << 29) - 1)
+
+
+def _mod_mersenne(x):
+    """x mod 2^61-1 for uint64 arrays (2^61 = 1 mod p, so fold the high bits onto the low ones)."""
+    p = np.uint64(MERSENNE_PRIME)
+    x = (x & p) + (x >> np.uint64(61))
+    return np.where(x >= p, x - p, x)
+
+
+def _mul_mod_mersenne(a, h):
+    """
+    Exact (a * h) mod 2^61-1 for a < 2^61 and h < 2^32 without overflowing uint64:
+    a = a_hi * 2^32 + a_lo, and a_hi * h * 2^32 is reduced by splitting a_hi * h
+    at bit 29 (2^29 * 2^32 = 2^61 = 1 mod p).
+    """
+    a_lo = a & LOW_32
+    a_hi = a >> np.uint64(32)
+    low = _mod_mersenne(a_lo * h)                    # < 2^64
+    high = a_hi * h                                  # < 2^61
+    high = (high >> np.uint64(29)) + ((high & LOW_29) << np.uint64(32))
+    return _mod_mersenne(low + _mod_mersenne(high))
+
+
+def shingles(text, k=SHINGLE_CHARS):
+    """Set of overlapping k-character shingles of the normalized text."""
+    text = normalize_content(text)
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+class MinHasher:
+    """MinHash signatures with fixed, seeded permutations (comparable across runs)."""
+
+    def __init__(self, num_perm=MINHASH_PERMUTATIONS, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # Coefficients span the whole field - small ones leave (a * h + b) mod p nearly
+        # order-preserving in h, which correlates the permutations
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        """MinHash signature (uint64 array) of a set of shingles; None for an empty set."""
+        if not shingle_set:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingle_set),
+            dtype=np.uint64, count=len(shingle_set)
+        )
+        # (a * h + b) mod p for every permutation and shingle, then the minimum per permutation
+        permuted = _mod_mersenne(_mul_mod_mersenne(self._a[:, None], hashes[None, :]) + self._b[:, None])
+        return permuted.min(axis=1)
+
+
+def estimated_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity: the share of matching MinHash slots."""
+    return float(np.mean(signature_a == signature_b))
+
+
+class NearDuplicateIndex:
+    """
+    Locality-sensitive hash index over MinHash signatures.
+
+    Each signature is cut into bands; documents sharing any band land in the
+    same bucket and become candidates, which are then confirmed with the
+    estimated Jaccard similarity. Lookups cost a few dict probes instead of a
+    comparison against every document.
+    """
+
+    def __init__(self, num_perm=MINHASH_PERMUTATIONS, bands=LSH_BANDS, threshold=NEAR_DUPLICATE_THRESHOLD):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.signatures = {}
+        self._buckets = {}
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def signature(self, text):
+        return self.hasher.signature(shingles(text))
+
+    def add(self, key, text=None, signature=None):
+        """Index a document; returns its signature (None if the text is empty)."""
+        signature = self.signature(text) if signature is None else signature
+        if signature is None:
+            return None
+        self.signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+        return signature
+
+    def query(self, text=None, signature=None):
+        """Keys of indexed documents similar to this one, most similar first, as (key, similarity)."""
+        signature = self.signature(text) if signature is None else signature
+        if signature is None:
+            return []
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        matches = [(key, estimated_similarity(signature, self.signatures[key])) for key in candidates]
+        return sorted((match for match in matches if match[1] >= self.threshold), key=lambda m: -m[1])
+
+
+def cluster_near_duplicates(candidates, corpus=(), threshold=NEAR_DUPLICATE_THRESHOLD):
+    """
+    Group new articles that tell the same story, and match them to already
+    ranked articles from the recent corpus.
+
+    Args:
+        candidates (list): (key, text) pairs for the new articles, in priority
+                           order - the first member of a cluster represents it
+        corpus (iterable): (key, text) pairs for recently ranked articles
+        threshold (float): Minimum estimated Jaccard similarity
+
+    Returns:
+        tuple: (corpus_matches, clusters)
+               corpus_matches - {candidate key: (corpus key, similarity)}
+               clusters - [[representative key, duplicate key, ...]] for
+                          candidates not matched to the corpus (singletons included)
+    """
+    corpus_index = NearDuplicateIndex(threshold=threshold)
+    for key, text in corpus:
+        corpus_index.add(key, text)
+
+    candidate_index = NearDuplicateIndex(threshold=threshold)
+    corpus_matches = {}
+    clusters = []
+    cluster_of = {}
+
+    for key, text in candidates:
+        signature = candidate_index.signature(text)
+        if signature is None:
+            clusters.append([key])
+            continue
+
+        matches = corpus_index.query(signature=signature)
+        if matches:
+            corpus_matches[key] = matches[0]
+            continue
+
+        similar = candidate_index.query(signature=signature)
+        if similar:
+            cluster = cluster_of[similar[0][0]]
+            cluster.append(key)
+        else:
+            cluster = [key]
+            clusters.append(cluster)
+        cluster_of[key] = cluster
+        candidate_index.add(key, signature=signature)
+
+    return corpus_matches, clusters
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import math
+import random
+import re
+import time
+
+from feed_cache import atomic_write_json
+
+# Score fields stored with every ranked article in DynamoDB
+SCORE_FIELDS = ["digital_transformation", "generative_ai", "machine_learning", "finance_in_tech"]
+
+# An article counts as relevant when any topic scored at least "medium" (6-10 on the 0-15 rubric)
+RELEVANT_SCORE = 6
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9+#\-]{1,30}")
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have
+he her his how i if in into is it its just more most new no not now of on one or our out over she so some
+than that the their them then there these they this to up us was we were what when which who will with
+would you your said says year years""".split())
+
+# Used until a model has been trained on stored LLM scores
+SEED_KEYWORDS = {
+    "ai": 1.5, "artificial": 1.0, "intelligence": 1.0, "generative": 2.0, "genai": 2.0, "llm": 2.0, "llms": 2.0,
+    "gpt": 1.5, "chatgpt": 1.5, "openai": 1.5, "anthropic": 1.5, "gemini": 1.0, "model": 0.5, "models": 0.5,
+    "machine": 1.0, "learning": 1.0, "data": 1.0, "analytics": 1.0, "science": 0.5, "neural": 1.0,
+    "digital": 1.0, "transformation": 1.5, "automation": 1.0, "cloud": 0.5, "enterprise": 0.5, "agents": 1.0,
+    "fintech": 2.0, "bank": 1.0, "banking": 1.0, "payments": 1.0, "finance": 1.0, "financial": 1.0,
+    "investment": 0.5, "funding": 0.5, "startup": 0.5,
+}
+
+
+def tokenize(text):
+    """Lowercased word features (stopwords dropped, each word counted once)."""
+    return {token for token in TOKEN_RE.findall((text or "").lower()) if token not in STOPWORDS}
+
+
+def article_features_text(title, summary):
+    """The text the pre-ranker sees: what the RSS feed gives us before any download."""
+    return f"{title or ''} {summary or ''}"
+
+
+def is_relevant(article, relevant_score=RELEVANT_SCORE):
+    """Label a stored article from its LLM scores."""
+    scores = []
+    for field in SCORE_FIELDS:
+        try:
+            scores.append(int(article.get(field, 0) or 0))
+        except (TypeError, ValueError):
+            continue
+    return max(scores, default=0) >= relevant_score
+
+
+def _holdout(key, fraction):
+    """Deterministic train/holdout split by URL hash, so evaluation is repeatable."""
+    bucket = int(hashlib.md5(str(key).encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return bucket < fraction
+
+
+class PreRanker:
+    """
+    Microsecond-scale relevance filter that runs before the LLM.
+
+    A logistic regression over binary word features of the RSS title and
+    summary, trained on the scores the LLM already assigned to stored
+    articles. Until it has been trained it falls back to a small keyword
+    lexicon. score() returns the estimated probability that the LLM would
+    rate the article as relevant to at least one topic.
+    """
+
+    def __init__(self, weights=None, bias=0.0, trained_on=0, trained_at=None, relevant_score=RELEVANT_SCORE):
+        self.weights = weights or {}
+        self.bias = bias
+        self.trained_on = trained_on
+        self.trained_at = trained_at
+        self.relevant_score = relevant_score
+
+    @property
+    def is_trained(self):
+        return bool(self.weights)
+
+    def score(self, title, summary=""):
+        """Probability (0-1) that the article is relevant."""
+        tokens = tokenize(article_features_text(title, summary))
+        if not self.is_trained:
+            hits = sum(SEED_KEYWORDS.get(token, 0.0) for token in tokens)
+            return 1 - math.exp(-hits / 2)
+        z = self.bias + sum(self.weights.get(token, 0.0) for token in tokens)
+        return 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def fit(self, documents, labels, epochs=15, learning_rate=0.2, l2=1e-4, min_count=2, seed=42):
+        """
+        Train on (title+summary text, relevant?) pairs with plain SGD.
+        Words seen in fewer than min_count documents are ignored.
+        """
+        token_sets = [tokenize(document) for document in documents]
+        counts = {}
+        for tokens in token_sets:
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+        vocabulary = {token for token, count in counts.items() if count >= min_count}
+
+        positives = sum(1 for label in labels if label)
+        prior = (positives + 1) / (len(labels) + 2)
+        weights = {}
+        bias = math.log(prior / (1 - prior))
+
+        order = list(range(len(token_sets)))
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            rate = learning_rate / (1 + epoch * 0.5)
+            for i in order:
+                tokens = token_sets[i] & vocabulary
+                z = bias + sum(weights.get(token, 0.0) for token in tokens)
+                prediction = 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+                gradient = prediction - (1.0 if labels[i] else 0.0)
+                bias -= rate * gradient
+                for token in tokens:
+                    weight = weights.get(token, 0.0)
+                    weights[token] = weight - rate * (gradient + l2 * weight)
+
+        self.weights = {token: round(weight, 5) for token, weight in weights.items() if abs(weight) > 1e-4}
+        self.bias = bias
+        self.trained_on = len(token_sets)
+        self.trained_at = time.time()
+        return self
+
+    def evaluate(self, documents, labels, thresholds=(0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5)):
+        """
+        Precision/recall of "send to the LLM" decisions against the LLM's own labels.
+
+        Recall is the share of truly relevant articles that would still reach
+        the LLM; skipped_pct is the share of articles that would not.
+
+        Returns:
+            list: One dict per threshold, plus the mean scoring time in microseconds
+        """
+        started = time.perf_counter()
+        scores = [self.score(document) for document in documents]
+        micros = (time.perf_counter() - started) * 1e6 / max(1, len(documents))
+
+        results = []
+        for threshold in thresholds:
+            sent = [score >= threshold for score in scores]
+            true_positive = sum(1 for s, label in zip(sent, labels) if s and label)
+            sent_count = sum(sent)
+            relevant = sum(1 for label in labels if label)
+            results.append({
+                'threshold': threshold,
+                'precision': round(true_positive / sent_count, 3) if sent_count else 0.0,
+                'recall': round(true_positive / relevant, 3) if relevant else 1.0,
+                'skipped_pct': round(100.0 * (len(sent) - sent_count) / len(sent), 1) if sent else 0.0,
+                'micros_per_article': round(micros, 1),
+            })
+        return results
+
+    def save(self, path):
+        atomic_write_json(path, {
+            'weights': self.weights,
+            'bias': self.bias,
+            'trained_on': self.trained_on,
+            'trained_at': self.trained_at,
+            'relevant_score': self.relevant_score,
+        })
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved model, or return an untrained (keyword) pre-ranker if there is none."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        return cls(
+            weights=data.get('weights'),
+            bias=data.get('bias', 0.0),
+            trained_on=data.get('trained_on', 0),
+            trained_at=data.get('trained_at'),
+            relevant_score=data.get('relevant_score', RELEVANT_SCORE),
+        )
+
+
+def train_from_articles(articles, relevant_score=RELEVANT_SCORE, holdout_fraction=0.2):
+    """
+    Train a PreRanker on articles already scored by the LLM (DynamoDB items)
+    and evaluate it on a held-out slice.
+
+    Returns:
+        tuple: (trained PreRanker, evaluation rows from PreRanker.evaluate, holdout size)
+    """
+    train_docs, train_labels, test_docs, test_labels = [], [], [], []
+    for article in articles:
+        document = article_features_text(article.get("Title"), article.get("summary"))
+        if not document.strip():
+            continue
+        label = is_relevant(article, relevant_score)
+        if _holdout(article.get("url", document), holdout_fraction):
+            test_docs.append(document)
+            test_labels.append(label)
+        else:
+            train_docs.append(document)
+            train_labels.append(label)
+
+    if not train_docs:
+        raise ValueError("No scored articles with a title or summary to train on")
+
+    model = PreRanker(relevant_score=relevant_score).fit(train_docs, train_labels)
+    evaluation = model.evaluate(test_docs or train_docs, test_labels or train_labels)
+    return model, evaluation, len(test_docs)
@@ -472,3 +472,62 @@ prompt_dict = {
         """
     )
 }
+
+# Topics scored by the ranking agent (keys of the ranking JSON)
+RANKING_TOPICS = [
+    "Digital Transformation",
+    "Generative AI",
+    "Machine Learning / Data Science",
+    "Finance in tech",
+]
+
+# Single-article ranking prompt (PromptTemplate with a {text} variable)
+RANKING_PROMPT = """
+        Analyze the following article content and provide a relevance score (0-15) for each of the following topics:
+        - Digital Transformation
+        - Generative AI
+        - Machine Learning / Data Science
+        - Finance in tech
+
+        Guidelines:
+        0-5: low relevance
+        6-10: medium relevance
+        11-15: high relevance
+
+        Return only a JSON object exactly in this format:
+        {{
+        "Digital Transformation": score,
+        "Generative AI": score,
+        "Machine Learning / Data Science": score,
+        "Finance in tech": score
+        }}
+
+        Do not include any additional text or explanation.
+
+        Article content:
+        {text}
+        """
+
+# Multi-article ranking prompt: the rubric once, then every article in an <article id="..."> block
+BATCH_RANKING_PROMPT = """
+        Analyze each of the articles below and provide a relevance score (0-15) for each of the following topics:
+        - Digital Transformation
+        - Generative AI
+        - Machine Learning / Data Science
+        - Finance in tech
+
+        Guidelines:
+        0-5: low relevance
+        6-10: medium relevance
+        11-15: high relevance
+
+        Score every article independently. Return only a JSON array with exactly one object per article, in this format:
+        [
+        {{"id": "article id", "Digital Transformation": score, "Generative AI": score, "Machine Learning / Data Science": score, "Finance in tech": score}}
+        ]
+
+        Do not include any additional text or explanation.
+
+        Articles:
+        {articles}
+        """
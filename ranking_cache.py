@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_content(text):
+    """Canonical form of article text: Unicode-normalized, lowercased, whitespace collapsed."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def content_hash(text):
+    """SHA-256 of the normalized text - the same story under two URLs hashes the same."""
+    return hashlib.sha256(normalize_content(text).encode("utf-8")).hexdigest()
+
+
+def ranking_version(model, *prompts):
+    """
+    Short fingerprint of everything that determines a score: the model and
+    the prompt templates. Editing the rubric or switching models produces a
+    new version, so older cache entries simply stop matching.
+    """
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for prompt in prompts:
+        digest.update(b"\0" + prompt.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class RankingCache:
+    """
+    Persistent cache of topic scores keyed by (content hash, ranking version).
+
+    Lives in a small SQLite file next to the known-URL index, so rankings
+    survive restarts: an article whose save failed is not re-scored on the
+    next run, and syndicated copies of a story are scored once.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rankings ("
+                "content_hash TEXT NOT NULL, version TEXT NOT NULL, ranking TEXT NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (content_hash, version))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per operation keeps us safe across Streamlit and ranking threads
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:  # Commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, text, version):
+        """Cached ranking dict for this text and version, or None."""
+        key = content_hash(text)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT ranking FROM rankings WHERE content_hash = ? AND version = ?", (key, version)
+            ).fetchone()
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return json.loads(row[0]) if row else None
+
+    def put(self, text, version, ranking):
+        """Store a ranking (only complete, non-empty rankings are worth caching)."""
+        if not text or not ranking:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rankings (content_hash, version, ranking, created_at) VALUES (?, ?, ?, ?)",
+                (content_hash(text), version, json.dumps(ranking), time.time())
+            )
+
+    def stats(self):
+        """Hit/miss counters since startup."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,14 @@
+import pytest
+
+from benchmark_extraction import REGRESSION_CASES
+from html_extract import DEFAULT_BACKEND, extract_paragraph_text, extract_with_full_soup
+
+
+@pytest.mark.parametrize("name, html", REGRESSION_CASES)
+def test_default_backend_matches_reference(name, html):
+    assert extract_paragraph_text(html, DEFAULT_BACKEND) == extract_with_full_soup(html)
+
+
+@pytest.mark.parametrize("name, html", REGRESSION_CASES)
+def test_stream_backend_matches_reference(name, html):
+    assert extract_paragraph_text(html, "stream") == extract_with_full_soup(html)
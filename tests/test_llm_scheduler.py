@@ -0,0 +1,56 @@
+import pytest
+
+import llm_scheduler
+from llm_scheduler import LLMScheduler
+
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = _Response(status_code, headers)
+
+
+class APITimeoutError(Exception):
+    pass
+
+
+def _flaky(errors):
+    def call():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+    return call
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "LLM_BACKOFF_BASE", 0.001)
+
+
+def test_retries_rate_limits_and_transient_errors():
+    scheduler = LLMScheduler({"default": {"rpm": 60000, "tpm": 10 ** 7}})
+    errors = [_StatusError(429, {"retry-after-ms": "1"}), _StatusError(502), APITimeoutError()]
+    assert scheduler.run("m", _flaky(errors)) == "ok"
+    metrics = scheduler.metrics()[0]
+    assert (metrics['rate_limited'], metrics['transient_errors'], metrics['retries'], metrics['failures']) == (1, 2, 3, 0)
+
+
+def test_client_errors_are_not_retried():
+    scheduler = LLMScheduler({"default": {"rpm": 60000, "tpm": 10 ** 7}})
+    with pytest.raises(_StatusError):
+        scheduler.run("m", _flaky([_StatusError(400)]))
+    assert scheduler.metrics()[0]['retries'] == 0
+
+
+def test_gives_up_after_max_retries():
+    scheduler = LLMScheduler({"default": {"rpm": 60000, "tpm": 10 ** 7}}, max_retries=2)
+    with pytest.raises(_StatusError):
+        scheduler.run("m", _flaky([_StatusError(503) for _ in range(5)]))
+    assert scheduler.metrics()[0]['retries'] == 2
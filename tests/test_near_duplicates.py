@@ -0,0 +1,52 @@
+import random
+
+from near_duplicates import MinHasher, NearDuplicateIndex, cluster_near_duplicates, estimated_similarity, shingles
+
+
+def _sets_with_jaccard(rng, size, jaccard):
+    """Two sets of `size` elements whose true Jaccard similarity is `jaccard`."""
+    common = round(2 * size * jaccard / (1 + jaccard))
+    shared = {f"s{rng.random()}" for _ in range(common)}
+    a = shared | {f"a{rng.random()}" for _ in range(size - common)}
+    b = shared | {f"b{rng.random()}" for _ in range(size - common)}
+    return a, b
+
+
+def test_estimated_similarity_tracks_true_jaccard():
+    rng = random.Random(7)
+    hasher = MinHasher()
+    for target in (0.1, 0.3, 0.5, 0.7, 0.9):
+        errors = []
+        for _ in range(20):
+            a, b = _sets_with_jaccard(rng, 400, target)
+            true = len(a & b) / len(a | b)
+            errors.append(estimated_similarity(hasher.signature(a), hasher.signature(b)) - true)
+        # 64 permutations: standard error is at most ~0.06 per pair
+        assert abs(sum(errors) / len(errors)) < 0.05, target
+        assert max(abs(error) for error in errors) < 0.25, target
+
+
+def test_reworded_headlines_cluster_together():
+    original = ("OpenAI unveils GPT-5 with stronger reasoning and a new agent platform "
+                "for enterprise customers, the company said on Thursday")
+    reworded = ("OpenAI unveils GPT-5 with stronger reasoning and new agent platform "
+                "for enterprise customers, company says")
+    unrelated = "Bank of England holds rates as inflation cools in the services sector"
+
+    a, b = shingles(original), shingles(reworded)
+    assert len(a & b) / len(a | b) > 0.65
+
+    corpus_matches, clusters = cluster_near_duplicates(
+        [("original", original), ("reworded", reworded), ("unrelated", unrelated)]
+    )
+    assert corpus_matches == {}
+    assert clusters == [["original", "reworded"], ["unrelated"]]
+
+
+def test_corpus_match_is_reported():
+    index_text = "Nvidia shares jump after record data center revenue beats analyst forecasts"
+    candidate = "Nvidia shares jump after record data center revenue beats analysts' forecasts"
+    corpus_matches, clusters = cluster_near_duplicates([("new", candidate)], corpus=[("old", index_text)])
+    assert corpus_matches["new"][0] == "old"
+    assert clusters == []
+    assert NearDuplicateIndex().query(text=candidate) == []
@@ -0,0 +1,88 @@
+# OpenAI's rule of thumb for English text: ~4 characters per token
+CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(text):
+    """
+    Offline token estimate for a piece of text (no tokenizer download needed).
+    Accurate to roughly ±10% for English prose, which is enough for budgeting
+    and reporting.
+    """
+    if not text:
+        return 0
+    return max(1, int(round(len(text) / CHARS_PER_TOKEN)))
+
+
+def token_savings(original_tokens, tokens):
+    """
+    Report how many tokens a reduction saved.
+
+    Returns:
+        dict: original_tokens, tokens, tokens_saved and saved_pct (0-100)
+    """
+    saved = max(0, original_tokens - tokens)
+    return {
+        'original_tokens': original_tokens,
+        'tokens': tokens,
+        'tokens_saved': saved,
+        'saved_pct': round(100.0 * saved / original_tokens, 1) if original_tokens else 0.0,
+    }
+
+
+def token_reduction(original_text, reduced_text):
+    """Compare the token estimate before and after shrinking a text (see token_savings)."""
+    return token_savings(estimate_tokens(original_text), estimate_tokens(reduced_text))
+
+
+def truncate_head_tail(text, max_tokens, head_fraction=0.7, marker="\n[...]\n"):
+    """
+    Fit text into max_tokens by keeping its beginning and its end.
+
+    Articles state their subject up front and their conclusion at the end;
+    the middle is where long pieces are most repetitive. Cuts fall on word
+    boundaries and the gap is marked so the model knows text was removed.
+    """
+    if not text or max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text or ""
+    max_chars = max(0, int(max_tokens * CHARS_PER_TOKEN) - len(marker))
+    head_chars = int(max_chars * head_fraction)
+    tail_chars = max_chars - head_chars
+
+    head = text[:head_chars]
+    cut = head.rfind(" ")
+    if cut > head_chars // 2:
+        head = head[:cut]
+    tail = text[len(text) - tail_chars:] if tail_chars else ""
+    cut = tail.find(" ")
+    if 0 <= cut < tail_chars // 2:
+        tail = tail[cut + 1:]
+    return head.rstrip() + marker + tail.lstrip()
+
+
+def split_into_chunks(text, chunk_tokens):
+    """
+    Split text into pieces of at most ~chunk_tokens, packing whole paragraphs
+    where possible and splitting oversized paragraphs at word boundaries.
+    """
+    if not text:
+        return []
+    max_chars = max(1, int(chunk_tokens * CHARS_PER_TOKEN))
+    chunks = []
+    current = ""
+    for paragraph in text.split("\n"):
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(" ", 0, max_chars)
+            cut = cut if cut > max_chars // 2 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        if current and len(current) + 1 + len(paragraph) > max_chars:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n{paragraph}" if current else paragraph
+    if current.strip():
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]